@@ -1,48 +1,106 @@
 import json
-
-from openai import AsyncOpenAI
+from functools import lru_cache
+from math import inf
+from typing import Literal
 
 from agent.constants import (
     BASE_SYSTEM_MESSAGE,
     HALLWAYS,
+    LOCATION_GRAPH,
+    PLAYERS,
     ROOMS,
-    VENTS,
     AgentState,
     Role,
     Event,
     Action,
 )
+from agent.gateway import LLMGateway, get_gateway
+from agent.compaction import Compactor
+from agent.history import GameLog, HistoryStore
+from agent.mapindex import TRAVEL, VENT_INDEX, VENT_TRAVEL
+from agent.prompts import (
+    CHAT_TEMPLATE,
+    DECISION_TEMPLATES,
+    VOTE_TEMPLATE,
+    chat_turn,
+    prompt_stats,
+)
+from agent.scheduler import SchedulerConfig, urgency
 from agent.llm import (
     ACTION_MAP,
+    Move,
     continue_current_action,
     findClosestVent,
     getFastestPath,
     information_tools,
 )
 
+# think_first: a forced think() request, then the action on another request.
+# single_call: think() and the action come back as parallel tool calls of one
+# completion.
+DecisionMode = Literal["think_first", "single_call"]
+
+# Events that place another player ("seePlayer:Blue") where this agent is.
+SIGHTINGS = {"seePlayer", "seePlayerEnd", "killRange", "killRangeEnd", "seeBody"}
+
+
+class ChatDraft:
+    """The context messages of an agent's next chat prompt, built ahead of its turn."""
+
+    seen: int  # log offset (HistoryStore.mark) the context covers up to
+    messages: list[dict]
+
+    def __init__(self, seen: int, messages: list[dict]):
+        self.seen = seen
+        self.messages = messages
+
 
 class Agent:
     system_prompt: str
     role: Role
     color: str
-    chat_history: list[Event]
-    current_chat_history: list[Event]
-    event_history: list[Event]
-    action_history: list[Action]
+    history: HistoryStore  # this agent's view of the game log, in time order
+    compactor: Compactor  # budgeted view of history for meeting prompts
+    chat_draft: ChatDraft | None
+    sightings: dict[str, tuple[str, float]]  # player -> where and when last seen
+    bodies: dict[str, str]  # dead player -> where their body was seen
+    meeting_notes: str  # reachability of the body, for this meeting's prompts
     current_action: Action | None
     thought_history: list[str]
     thoughts: str
     last_known_state: AgentState | None = None
+    max_steps: int
+    decision_mode: DecisionMode
+    decisions: int
+    round_trips: int
+    step_overruns: int
+    gateway: LLMGateway
 
     def __init__(
-        self, role: Role, color: str, system_prompt="", other_imposters: list[str] = []
+        self,
+        role: Role,
+        color: str,
+        system_prompt="",
+        other_imposters: list[str] = [],
+        max_steps: int = 6,
+        decision_mode: DecisionMode = "think_first",
+        gateway: LLMGateway | None = None,
+        log: GameLog | None = None,
     ):
         self.role = role
         self.color = color
-        self.chat_history = []
-        self.current_chat_history = []
-        self.event_history = []
-        self.action_history = []
+        self.max_steps = max_steps
+        self.decision_mode = decision_mode
+        self.decisions = 0
+        self.round_trips = 0  # LLM requests made by on_event
+        self.step_overruns = 0  # decisions that hit max_steps and fell back
+        self.gateway = gateway or get_gateway()
+        self.history = HistoryStore(log)
+        self.compactor = Compactor()
+        self.chat_draft = None
+        self.sightings = {}
+        self.bodies = {}
+        self.meeting_notes = ""
         self.current_action = None
         self.thought_history = []
         self.thoughts = ""
@@ -155,15 +213,122 @@ class Agent:
             ),
         }
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _tools_for(
+        cls, location: str, available_vents: tuple[str, ...], names: tuple[str, ...]
+    ) -> tuple[dict, ...]:
+        """
+        The `tools` list for one decision context, built once and shared by
+        every agent in the process. The schemas must not be mutated.
+        """
+        schemas = cls._build_tool_schemas(location, list(available_vents))
+        return tuple(schemas[name] for name in names)
+
     def on_meeting_called(self, event: Event, state: AgentState):
         self.last_known_state = state
+        if event.type == "bodyFound" and event.data["caller"] == self.color:  # type: ignore
+            self.bodies[event.data["body"]] = state.location  # type: ignore
+        self.meeting_notes = self.reach_notes(event)
         if self.current_action is not None:
             self.current_action.interruptedAt = event.time
             self.current_action.interruptedBy = event
             self.current_action = None
 
-    def on_chat_message(self, message: Event):
-        self.current_chat_history.append(message)
+    def see(self, events: list[Event], location: str):
+        """Record who `events` place where this agent is."""
+        for event in events:
+            kind, _, player = event.type.partition(":")
+            if kind in SIGHTINGS and player:
+                if kind == "seeBody":
+                    self.bodies[player] = location
+                else:
+                    self.sightings[player] = (location, event.time)
+
+    def reach_notes(self, event: Event) -> str:
+        """
+        Which players, walking or venting from where this agent last saw
+        them, could have reached the reported body before the report.
+        """
+        if event.type != "bodyFound":
+            return ""
+        body = event.data["body"]  # type: ignore
+        location = self.bodies.get(body)
+        if location is None:
+            return ""
+        alive = event.data["alivePlayers"]  # type: ignore
+        seen = {
+            player: sighting
+            for player, sighting in self.sightings.items()
+            if player in alive and player != self.color
+        }
+        if not seen:
+            return ""
+        walking = TRAVEL.could_reach(seen, location, event.time)
+        venting = [
+            player
+            for player in VENT_TRAVEL.could_reach(seen, location, event.time)
+            if player not in walking
+        ]
+        unable = sorted(set(seen) - set(walking) - set(venting))
+        lines = [
+            f"{body}'s body was in {location}. From where you last saw them, "
+            f"by the report at t={event.time:.0f}:"
+        ]
+        if walking:
+            lines.append("- could have walked there: " + ", ".join(walking))
+        if venting:
+            lines.append("- could only have got there by venting: " + ", ".join(venting))
+        if unable:
+            lines.append("- could not have got there: " + ", ".join(unable))
+        return "\n\n" + "\n".join(lines)
+
+    def add_events(self, events: list[Event]):
+        self.history.extend(events)
+
+    def add_action(self, action: Action):
+        self.history.add(action)
+
+    def prepare_chat(self) -> ChatDraft:
+        """Build the meeting context for this agent's next chat turn now."""
+        self.chat_draft = ChatDraft(
+            self.history.mark(),
+            CHAT_TEMPLATE.render(
+                self.system_prompt,
+                self.role,
+                history="\n".join(self.compactor.view(self.history)),
+                state=self.last_known_state,
+                thoughts=self.thoughts,
+                notes=self.meeting_notes,
+            ),
+        )
+        return self.chat_draft
+
+    async def warm_chat(self):
+        """Send the drafted context alone, so the provider caches it as a prefix."""
+        draft = self.chat_draft or self.prepare_chat()
+        await self.gateway.complete(
+            priority=SchedulerConfig.SPECULATIVE_LEVEL,
+            messages=draft.messages,
+            max_completion_tokens=1,
+        )
+
+    def chat_messages(
+        self, body_found: bool, question_round: int, was_reporter=False
+    ) -> list[dict]:
+        # Whatever was said after the draft was built goes in the last message.
+        draft = self.chat_draft or self.prepare_chat()
+        self.chat_draft = None
+        said = [str(entry) for entry in self.history.since(draft.seen)]
+
+        ask = f"It is now your turn to speak in the meeting. What do you say? This is round {question_round}."
+        if was_reporter:
+            ask += (
+                " You are the one who "
+                + ("reported the body" if body_found else "called the meeting")
+                + ". You should share your thoughts about it."
+            )
+        return draft.messages + [chat_turn(said, ask)]
 
     async def on_request_chat(
         self,
@@ -171,85 +336,45 @@ class Agent:
         question_round: int,
         was_reporter=False,
     ):
-        total_history = (
-            self.chat_history
-            + self.action_history
-            + self.event_history
-            + self.current_chat_history
-        )
-        total_history.sort(key=lambda x: x.time)
-        total_history = total_history[-50:]
-
-        messages: list[dict] = [
-            {
-                "role": "system",
-                "content": self.system_prompt,
-            },
-            {
-                "role": "user",
-                "content": f"""Game History:
-{"\n".join(str(x) for x in total_history)}
-
-State Before Meeting:
-{str(self.last_known_state)}
-
-Current Thoughts:
-{self.thoughts}
-
-It is now your turn to speak in the meeting. What do you say?
-Just respond with what you would say, no filler text. Be concise. You should probably share any information you have, such as where you were, who you saw, and any suspicions you have. Limit your response to at most 3 sentences.
-There are 3 total rounds of questioning. This is round {question_round}.
-
-{("You are the one who " + ("reported the body" if body_found else "called the meeting")) if was_reporter else ""}. You should share your thoughts about it.""".strip()
-                + (
-                    "\n\nRemember, you are an imposter."
-                    if self.role == "imposter"
-                    else "If you see someone vent, you should call an emergency meeting and share that information, since only imposters can vent."
-                ),
-            },
-        ]
-
-        client = AsyncOpenAI()
+        messages = self.chat_messages(body_found, question_round, was_reporter)
 
-        completion = await client.chat.completions.create(
-            model="gpt-4.1-mini",
+        completion = await self.gateway.complete(
+            priority=SchedulerConfig.MEETING_LEVEL,
             messages=messages,  # type: ignore
         )
+        prompt_stats.record("chat", messages, completion.usage)
 
         return completion.choices[0].message.content
 
-    async def on_vote(self):
-        total_history = (
-            self.chat_history
-            + self.action_history
-            + self.event_history
-            + self.current_chat_history
+    async def stream_chat(
+        self,
+        body_found: bool,
+        question_round: int,
+        was_reporter=False,
+    ):
+        """on_request_chat(), yielding the message as the model writes it."""
+        messages = self.chat_messages(body_found, question_round, was_reporter)
+
+        async for delta, usage in self.gateway.stream(
+            priority=SchedulerConfig.MEETING_LEVEL, messages=messages
+        ):
+            if delta:
+                yield delta
+            if usage is not None:
+                prompt_stats.record("chat", messages, usage)
+
+    async def on_vote(self, candidates: list[str] = PLAYERS):
+        """The vote() tool arguments, e.g. '{"vote": "Red"}'."""
+        total_history = self.compactor.view(self.history)
+        messages = VOTE_TEMPLATE.render(
+            self.system_prompt,
+            self.role,
+            history="\n".join(total_history),
+            state=self.last_known_state,
+            thoughts=self.thoughts,
+            notes=self.meeting_notes,
+            ask="It is time to vote in the meeting.",
         )
-        messages: list[dict] = [
-            {
-                "role": "system",
-                "content": self.system_prompt,
-            },
-            {
-                "role": "user",
-                "content": f"""Game History:
-{"\n".join(str(x) for x in total_history)}
-
-State Before Meeting:
-{str(self.last_known_state)}
-
-Current Thoughts:
-{self.thoughts}
-
-It is time to vote in the meeting. You can either vote to eject a player or skip the vote.
-""".strip()
-                + (
-                    "\n\nRemember, you are an imposter."
-                    if self.role == "imposter"
-                    else ""
-                ),
-            },
-        ]
 
         tools = [
             {
@@ -262,15 +387,7 @@ It is time to vote in the meeting. You can either vote to eject a player or skip
                         "properties": {
                             "vote": {
                                 "type": "string",
-                                "enum": [
-                                    "skip",
-                                    "Red",
-                                    "Blue",
-                                    "Green",
-                                    "Pink",
-                                    "Yellow",
-                                    "Purple",
-                                ],
+                                "enum": ["skip", *candidates],
                             }
                         },
                         "required": ["vote"],
@@ -279,17 +396,42 @@ It is time to vote in the meeting. You can either vote to eject a player or skip
             }
         ]
 
-        client = AsyncOpenAI()
-
-        response = await client.chat.completions.create(
-            model="gpt-4.1-mini",
+        response = await self.gateway.complete(
+            priority=SchedulerConfig.MEETING_LEVEL,
             messages=messages,  # type: ignore
             tools=tools,  # type: ignore
             tool_choice={"type": "function", "function": {"name": "vote"}},
         )
+        prompt_stats.record("vote", messages, response.usage)
 
         return response.choices[0].message.tool_calls[0].function.arguments  # type: ignore
 
+    def fallback_action(self, events: list[Event], state: AgentState) -> Action | None:
+        """
+        Deterministic decision for when the model runs out of time or steps:
+        keep doing the current action, otherwise walk to the nearest incomplete
+        task (or the first neighbouring location).
+        """
+        if self.current_action is not None or "Move" not in state.availableActions:
+            return None
+
+        destinations = sorted(
+            (
+                task.location
+                for task in state.tasks
+                if task.status != "complete" and task.location != state.location
+            ),
+            key=lambda location: TRAVEL.eta(state.location, location) or inf,
+        ) + sorted(LOCATION_GRAPH.get(state.location, ()))
+        if not destinations:
+            return None
+
+        action = Move(to=destinations[0])
+        action.time = events[-1].time
+        self.current_action = action
+        self.add_action(action)
+        return action
+
     async def on_event(self, events: list[Event], state: AgentState) -> Action | None:
         for event in events:
             if event.type == "reachLocation":
@@ -307,9 +449,10 @@ It is time to vote in the meeting. You can either vote to eject a player or skip
                     self.current_action.completedAt = event.time
                     self.current_action = None
 
-        available_vents = set()
+        available_vents: tuple[str, ...] = ()
 
-        self.event_history += events
+        self.add_events(events)
+        self.see(events, state.location)
 
         meeting_events = [
             event for event in events if event.type in ["bodyFound", "emergencyMeeting"]
@@ -323,9 +466,7 @@ It is time to vote in the meeting. You can either vote to eject a player or skip
             print([str(event) for event in events if event.type == "seeEnterVent"])
 
         if "Vent" in state.availableActions:
-            vent_set = set([vents for vents in VENTS if state.location in vents][0])
-            vent_set.remove(state.location)
-            available_vents = vent_set
+            available_vents = VENT_INDEX.destinations(state.location)
 
         allowed_actions = [
             ACTION_MAP[action] for action in state.availableActions
@@ -334,101 +475,116 @@ It is time to vote in the meeting. You can either vote to eject a player or skip
         if self.current_action is not None:
             allowed_actions.append(continue_current_action)
 
-        total_history = self.chat_history + self.action_history + self.event_history
-        total_history.sort(key=lambda x: x.time)
-        total_history = total_history[-50:]
+        total_history = self.history.last(50)
 
-        messages: list[dict] = [
-            {
-                "role": "system",
-                "content": self.system_prompt,
-            },
-            {
-                "role": "user",
-                "content": f"""Game History:
-{"\n".join(str(x) for x in total_history)}
-
-Current Time:
-{events[-1].time}
-
-Current State:
-{str(state)}
-
-Current Action:
-{str(self.current_action)}
-
-Current Thoughts:
-{self.thoughts}
-
-What would you like to do?
-You can either:
-1. Update your thoughts using the think() function. Your future events will see this new thought. You should do this at max once. You should format your thought as:
-"Current Priority: <what your current priority is, e.g. 'gathering information', 'completing tasks', 'sabotaging', etc.>
-Reasoning: <your reasoning for this priority>
-Next Steps: <what your next steps are to accomplish this priority>
-Additional Notes: <any additional notes you have>"
-2. Use getFastestPath() or findClosestVent() to get information about the map to help you make a decision.
-3. Take an action using the allowed actions. Taking an action ends your turn.
-{"4. Continue your current action using the continue_current_action() function. This ends your turn. You should do this if the nothing too important happened." if self.current_action is not None else ""}
-You can only call one tool at a time.
-Unless something really unexpected happens, you should probably continue your current action.
-Remember: Only imposters can kill and vent.
-Note: Do not move to the room you are currently in.
-Note: No matter what, you must send a tool call. If you don't want to do anything, you can call continue_current_action() to continue doing nothing. If you want to think, use the think() function."""
-                + (
-                    "\n\nNote: If you want to vent, you can only vent to "
-                    + ", ".join(available_vents)
-                    if available_vents and self.role == "imposter"
-                    else ""
-                )
-                + (
-                    "\n\nRemember, you are an imposter. If you see a free kill without many people around, you should take it. Additionally, you should be relatively aggressive in kills."
-                    if self.role == "imposter"
-                    else "You should report bodies as soon as you see them."
-                ),
-            },
-        ]
-        tool_schemas = self._build_tool_schemas(
-            location=state.location, available_vents=list(available_vents)
+        notes = ""
+        task_locations = {
+            task.location
+            for task in state.tasks
+            if task.status != "complete" and task.location != state.location
+        }
+        etas = sorted(
+            (eta, location)
+            for location in task_locations
+            if (eta := TRAVEL.eta(state.location, location)) is not None
+        )
+        if etas:
+            notes += "\n\nWalking time to your tasks: " + ", ".join(
+                f"{location} {eta:.1f}s" for eta, location in etas
+            )
+        if self.current_action is not None:
+            notes += "\n\nYou can continue your current action with continue_current_action()."
+        if available_vents and self.role == "imposter":
+            notes += "\n\nNote: If you want to vent, you can only vent to " + ", ".join(
+                available_vents
+            )
+            further = [
+                f"{vent} ({jumps} jumps)"
+                for vent, jumps in VENT_INDEX.reachable[state.location].items()
+                if jumps > 1
+            ]
+            if further:
+                notes += ". Chaining vents also reaches " + ", ".join(further)
+        messages = DECISION_TEMPLATES[self.decision_mode].render(
+            self.system_prompt,
+            self.role,
+            history="\n".join(str(x) for x in total_history),
+            time=events[-1].time,
+            state=state,
+            action=self.current_action,
+            thoughts=self.thoughts,
+            notes=notes,
+        )
+        tools = self._tools_for(
+            state.location,
+            available_vents,
+            tuple(action.__name__ for action in allowed_actions),
         )
-        tools = [tool_schemas[action.__name__] for action in allowed_actions]
-        client = AsyncOpenAI()
 
         hasThought = False
+        steps = 0
+        single_call = self.decision_mode == "single_call"
+        priority = urgency(events, state, self.role)
+        self.decisions += 1
 
         while True:
-            response = await client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=messages,  # type: ignore
-                tools=tools,  # type: ignore
-                tool_choice=(
-                    "required"
-                    if hasThought
-                    else {"type": "function", "function": {"name": "think"}}
-                ),
-            )
+            if steps >= self.max_steps:
+                self.step_overruns += 1
+                return self.fallback_action(events, state)
+            steps += 1
+            self.round_trips += 1
+            if single_call:
+                response = await self.gateway.complete(
+                    priority=priority,
+                    messages=messages,  # type: ignore
+                    tools=tools,  # type: ignore
+                    tool_choice="required",
+                    parallel_tool_calls=True,
+                )
+            else:
+                response = await self.gateway.complete(
+                    priority=priority,
+                    messages=messages,  # type: ignore
+                    tools=tools,  # type: ignore
+                    tool_choice=(
+                        "required"
+                        if hasThought
+                        else {"type": "function", "function": {"name": "think"}}
+                    ),
+                )
+            prompt_stats.record("decision", messages, response.usage)
             hasThought = True
             tool_calls = response.choices[0].message.tool_calls or []
-            if tool_calls:
-                tool_call = tool_calls[0]
+            if single_call:
+                # The action ends the turn, so apply a thought sent alongside it first.
+                tool_calls = sorted(
+                    tool_calls,
+                    key=lambda call: call.function.name != "think",  # type: ignore
+                )
+            else:
+                tool_calls = tool_calls[:1]
+            if not tool_calls:
+                continue
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": tool_call.id,
+                            "type": "function",
+                            "function": {
+                                "name": tool_call.function.name,  # type: ignore
+                                "arguments": tool_call.function.arguments,  # type: ignore
+                            },
+                        }
+                        for tool_call in tool_calls
+                    ],
+                }
+            )
+            for tool_call in tool_calls:
                 tool_name = tool_call.function.name  # type: ignore
                 tool_args = json.loads(tool_call.function.arguments or "{}")  # type: ignore
-                messages.append(
-                    {
-                        "role": "assistant",
-                        "content": None,
-                        "tool_calls": [
-                            {
-                                "id": tool_call.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tool_name,
-                                    "arguments": tool_call.function.arguments,  # type: ignore
-                                },
-                            }
-                        ],
-                    }
-                )
                 if tool_name == "think":
                     self.thoughts = tool_args["new_thought"]
                     self.thought_history.append(self.thoughts)
@@ -455,15 +611,20 @@ Note: No matter what, you must send a tool call. If you don't want to do anythin
                 elif tool_name == "findClosestVent":
                     location = tool_args["location"]
                     closest_vent = findClosestVent(location)
+                    content = f"The closest vent to {location} is {closest_vent}."
+                    if VENT_INDEX.destinations(closest_vent):
+                        content += " It connects to " + ", ".join(
+                            VENT_INDEX.destinations(closest_vent)
+                        ) + "."
                     messages.append(
                         {
                             "role": "tool",
                             "tool_call_id": tool_call.id,
-                            "content": f"The closest vent to {location} is {closest_vent}.",
+                            "content": content,
                         }
                     )
                 elif tool_name == "continue_current_action":
-                    break
+                    return None
                 else:
                     if tool_name == "Move" and tool_args["to"] == state.location:
                         messages.append(
@@ -481,7 +642,7 @@ Note: No matter what, you must send a tool call. If you don't want to do anythin
                         self.current_action.interruptedBy = events[-1]
                     if action.type in ["Move", "Task"]:
                         self.current_action = action
-                    self.action_history.append(action)
+                    self.add_action(action)
 
                     if self.role == "imposter":
                         print(f"Imposter Action: {action}")
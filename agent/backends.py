@@ -0,0 +1,373 @@
+import asyncio
+from abc import ABC, abstractmethod
+from itertools import count
+from json import dumps
+from random import Random
+from time import monotonic
+
+from agent.compaction import estimate_tokens
+from agent.constants import HALLWAYS, PLAYERS, ROOMS
+from agent.ratelimit import TokenBucket
+
+
+class Function:
+    name: str
+    arguments: str
+
+    def __init__(self, name: str, arguments: str):
+        self.name = name
+        self.arguments = arguments
+
+
+class ToolCall:
+    id: str
+    type: str
+    function: Function
+
+    def __init__(self, id: str, function: Function):
+        self.id = id
+        self.type = "function"
+        self.function = function
+
+
+class Message:
+    role: str
+    content: str | None
+    tool_calls: list[ToolCall] | None
+
+    def __init__(self, content: str | None = None, tool_calls: list[ToolCall] | None = None):
+        self.role = "assistant"
+        self.content = content
+        self.tool_calls = tool_calls
+
+
+class Choice:
+    index: int
+    message: Message
+
+    def __init__(self, message: Message, index: int = 0):
+        self.index = index
+        self.message = message
+
+
+class PromptTokensDetails:
+    cached_tokens: int
+
+    def __init__(self, cached_tokens: int = 0):
+        self.cached_tokens = cached_tokens
+
+
+class Usage:
+    prompt_tokens: int
+    completion_tokens: int
+    prompt_tokens_details: PromptTokensDetails
+
+    def __init__(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.prompt_tokens_details = PromptTokensDetails(cached_tokens)
+
+
+class Completion:
+    """The subset of the OpenAI ChatCompletion shape that agents read."""
+
+    choices: list[Choice]
+    usage: Usage
+
+    def __init__(self, message: Message, usage: Usage):
+        self.choices = [Choice(message)]
+        self.usage = usage
+
+
+class LLMBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, **kwargs):
+        """A chat completion, as the chat completions API returns it."""
+
+    async def stream(self, **kwargs):
+        """(text delta, usage) pairs of a text completion; usage comes last."""
+        completion = await self.complete(**kwargs)
+        yield completion.choices[0].message.content or "", completion.usage
+
+    def is_retryable(self, error: Exception) -> bool:
+        return False
+
+    def status_code(self, error: Exception) -> int | None:
+        return None
+
+    def retry_after(self, error: Exception) -> float | None:
+        return None
+
+    def is_timeout(self, error: Exception) -> bool:
+        return False
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+
+    def __init__(
+        self,
+        timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+    ):
+        import httpx
+        import openai
+
+        self.openai = openai
+        self.client = openai.AsyncOpenAI(
+            timeout=timeout,
+            max_retries=0,  # the gateway retries, so every retry is counted
+            http_client=openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                )
+            ),
+        )
+
+    async def complete(self, **kwargs):
+        return await self.client.chat.completions.create(**kwargs)
+
+    async def stream(self, **kwargs):
+        chunks = await self.client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **kwargs
+        )
+        async for chunk in chunks:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta or chunk.usage is not None:
+                yield delta or "", chunk.usage
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (self.openai.APIConnectionError, self.openai.APITimeoutError)):
+            return True
+        code = self.status_code(error)
+        return code is not None and (code == 429 or code >= 500)
+
+    def status_code(self, error: Exception) -> int | None:
+        if isinstance(error, self.openai.APIStatusError):
+            return error.status_code
+        return None
+
+    def retry_after(self, error: Exception) -> float | None:
+        if isinstance(error, self.openai.APIStatusError):
+            try:
+                return float(error.response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def is_timeout(self, error: Exception) -> bool:
+        return isinstance(error, self.openai.APITimeoutError)
+
+
+class MockConfig:
+    MEDIAN_LATENCY = 0.8  # seconds
+    FIRST_TOKEN_SHARE = 0.3  # of a streamed reply's latency, spent before its first word
+    LATENCY_SIGMA = 0.5  # spread of the log-normal latency distribution
+    MAX_LATENCY = 10.0
+    RATE_LIMIT_PROBABILITY = 0.0  # chance a call fails with a simulated 429
+    # Simulated provider quota: calls over it fail with a 429 as they arrive.
+    # None leaves that quota out.
+    REQUESTS_PER_MINUTE: float | None = None
+    TOKENS_PER_MINUTE: float | None = None
+    QUOTA_BURST_SECONDS = 1.0
+    INFORMATION_TOOL_PROBABILITY = 0.1  # chance to look up the map before acting
+    # Simulated provider prefix cache: whole leading messages seen before are
+    # reported as cached, once the prompt is long enough to be cached at all.
+    CACHE_MIN_TOKENS = 1024
+    CACHE_ENTRIES = 10_000
+    SEED: int | None = None
+
+
+class MockRateLimitError(Exception):
+    status_code = 429
+
+
+THOUGHT = (
+    "Current Priority: completing tasks\n"
+    "Reasoning: nothing suspicious has happened yet\n"
+    "Next Steps: move to my next task\n"
+    "Additional Notes: none"
+)
+LOCATIONS = ROOMS + HALLWAYS
+INFORMATION_TOOLS = {"getFastestPath", "findClosestVent"}
+
+
+class MockBackend(LLMBackend):
+    """
+    Offline stand-in that answers like the chat completions API.
+
+    Tool calls are drawn from the offered schemas, so names, enums and
+    required arguments are always valid; latency is log-normal.
+    """
+
+    name = "mock"
+
+    def __init__(self, config=MockConfig):
+        self.config = config
+        self.rng = Random(config.SEED)
+        self._ids = count(1)
+        self._prefixes: set[int] = set()
+        now = monotonic()
+        self._quotas = [
+            (TokenBucket(per_minute, config.QUOTA_BURST_SECONDS, now), per_request)
+            for per_minute, per_request in (
+                (config.REQUESTS_PER_MINUTE, False),
+                (config.TOKENS_PER_MINUTE, True),
+            )
+            if per_minute
+        ]
+
+    def admit(self, kwargs: dict):
+        """Charge a call to the simulated quota, or raise a 429 if it is over."""
+        if not self._quotas:
+            return
+        now = monotonic()
+        tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in kwargs["messages"])
+        tokens += kwargs.get("max_completion_tokens") or 0
+        for bucket, per_token in self._quotas:
+            bucket.refill(now)
+            if bucket.level < (tokens if per_token else 1):
+                raise MockRateLimitError("simulated quota exceeded")
+        for bucket, per_token in self._quotas:
+            bucket.take(tokens if per_token else 1)
+
+    def latency(self) -> float:
+        return min(
+            self.config.MAX_LATENCY,
+            self.rng.lognormvariate(0, self.config.LATENCY_SIGMA)
+            * self.config.MEDIAN_LATENCY,
+        )
+
+    def argument(self, name: str, schema: dict):
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        if name == "new_thought":
+            return THOUGHT
+        return self.rng.choice(LOCATIONS)
+
+    def tool_call(self, tool: dict) -> ToolCall:
+        function = tool["function"]
+        properties = function["parameters"].get("properties", {})
+        arguments = {
+            name: self.argument(name, properties[name])
+            for name in function["parameters"].get("required", [])
+        }
+        return ToolCall(
+            f"call_mock_{next(self._ids)}",
+            Function(function["name"], dumps(arguments)),
+        )
+
+    def pick_tool(self, tools: list[dict], tool_choice) -> dict:
+        by_name = {tool["function"]["name"]: tool for tool in tools}
+        if isinstance(tool_choice, dict):
+            return by_name[tool_choice["function"]["name"]]
+        information = [name for name in by_name if name in INFORMATION_TOOLS]
+        if information and self.rng.random() < self.config.INFORMATION_TOOL_PROBABILITY:
+            return by_name[self.rng.choice(information)]
+        if "continue_current_action" in by_name and self.rng.random() < 0.5:
+            return by_name["continue_current_action"]
+        actions = [
+            name for name in by_name if name not in INFORMATION_TOOLS and name != "think"
+        ]
+        return by_name[self.rng.choice(actions or list(by_name))]
+
+    def has_thought(self, messages: list[dict]) -> bool:
+        return any(
+            call["function"]["name"] == "think"
+            for message in messages
+            for call in message.get("tool_calls") or ()
+        )
+
+    def cached_tokens(self, messages: list[dict], prompt_tokens: int) -> int:
+        cached = tokens = 0
+        key = 0
+        for message in messages:
+            key = hash(
+                (key, message["role"], message.get("content"), str(message.get("tool_calls")))
+            )
+            tokens += estimate_tokens(str(message.get("content") or ""))
+            if key in self._prefixes:
+                cached = tokens
+            else:
+                if len(self._prefixes) >= self.config.CACHE_ENTRIES:
+                    self._prefixes.clear()
+                self._prefixes.add(key)
+        return cached if prompt_tokens >= self.config.CACHE_MIN_TOKENS else 0
+
+    def chat_line(self) -> str:
+        return (
+            f"I was in {self.rng.choice(ROOMS)} and saw {self.rng.choice(PLAYERS)} "
+            f"near {self.rng.choice(ROOMS)}."
+        )
+
+    async def complete(self, **kwargs):
+        self.admit(kwargs)
+        await asyncio.sleep(self.latency())
+        if self.rng.random() < self.config.RATE_LIMIT_PROBABILITY:
+            raise MockRateLimitError("simulated rate limit")
+
+        tools = kwargs.get("tools")
+        if tools and kwargs.get("tool_choice") != "none":
+            tool = self.pick_tool(tools, kwargs.get("tool_choice"))
+            tool_calls = [self.tool_call(tool)]
+            # With parallel calls allowed, think once and act in the same reply.
+            if (
+                kwargs.get("parallel_tool_calls")
+                and tool["function"]["name"] != "think"
+                and any(t["function"]["name"] == "think" for t in tools)
+                and not self.has_thought(kwargs["messages"])
+            ):
+                think = next(t for t in tools if t["function"]["name"] == "think")
+                tool_calls.insert(0, self.tool_call(think))
+            message = Message(tool_calls=tool_calls)
+            completion_text = "".join(call.function.arguments for call in tool_calls)
+        else:
+            message = Message(content=self.chat_line())
+            completion_text = message.content or ""
+
+        prompt_tokens = sum(
+            estimate_tokens(str(m.get("content") or "")) for m in kwargs["messages"]
+        )
+        return Completion(
+            message,
+            Usage(
+                prompt_tokens,
+                estimate_tokens(completion_text),
+                self.cached_tokens(kwargs["messages"], prompt_tokens),
+            ),
+        )
+
+    async def stream(self, **kwargs):
+        self.admit(kwargs)
+        latency = self.latency()
+        await asyncio.sleep(latency * self.config.FIRST_TOKEN_SHARE)
+        if self.rng.random() < self.config.RATE_LIMIT_PROBABILITY:
+            raise MockRateLimitError("simulated rate limit")
+
+        words = self.chat_line().split(" ")
+        pause = latency * (1 - self.config.FIRST_TOKEN_SHARE) / len(words)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(pause)
+            yield (" " if i else "") + word, None
+
+        prompt_tokens = sum(
+            estimate_tokens(str(m.get("content") or "")) for m in kwargs["messages"]
+        )
+        yield "", Usage(
+            prompt_tokens,
+            estimate_tokens(" ".join(words)),
+            self.cached_tokens(kwargs["messages"], prompt_tokens),
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, MockRateLimitError)
+
+    def status_code(self, error: Exception) -> int | None:
+        return getattr(error, "status_code", None)
@@ -0,0 +1,53 @@
+import json
+import os
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; the stdlib codec still works without it
+    orjson = None
+
+
+class Codec:
+    name: str
+    loads: Callable[[bytes | bytearray | memoryview | str], Any]
+    dumps: Callable[[Any], bytes]
+
+    def __init__(self, name: str, loads: Callable, dumps: Callable):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+def _json_loads(data: bytes | bytearray | memoryview | str) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+CODECS: dict[str, Codec] = {"json": Codec("json", _json_loads, _json_dumps)}
+
+if orjson is not None:
+    CODECS["orjson"] = Codec("orjson", orjson.loads, orjson.dumps)
+
+codec: Codec = CODECS.get(os.environ.get("JSON_CODEC", "orjson"), CODECS["json"])
+
+
+def use_codec(name: str) -> Codec:
+    global codec
+    if name not in CODECS:
+        raise ValueError(f"unknown JSON codec {name!r}, available: {', '.join(CODECS)}")
+    codec = CODECS[name]
+    return codec
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    return codec.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    return codec.dumps(obj)
@@ -0,0 +1,220 @@
+from collections import Counter
+from math import inf
+from typing import Sequence
+
+from agent.constants import Action, Event
+from agent.history import Entry, HistoryStore
+
+# Event types whose lines are kept word for word inside a summary.
+NOTABLE = {
+    "seeBody",
+    "seeEnterVent",
+    "seeExitVent",
+    "seeKill",
+    "completeKill",
+    "vent",
+    "sabotage",
+    "bodyFound",
+    "emergencyMeeting",
+    "meetingEnd",
+    "vote",
+}
+NOTABLE_ACTIONS = {"Kill", "Vent", "Report", "CallMeeting", "Sabotage"}
+
+
+class CompactionConfig:
+    TOKEN_BUDGET = 3000  # history tokens in a meeting prompt
+    RECENT_ENTRIES = 50  # newest entries, never summarised
+    CHUNK_ENTRIES = 25  # older entries folded into one summary at a time
+    MAX_NOTABLE = 8  # verbatim lines a summary keeps, newest first
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def base_type(event: Event) -> str:
+    # Unity suffixes per-player events with the player, e.g. "seePlayer:Blue".
+    return event.type.split(":", 1)[0]
+
+
+class Summary:
+    start: float
+    end: float
+    near: Counter[str]
+    reached: Counter[str]
+    tasks: int
+    chat: Counter[str]
+    other: int
+    notable: list[str]
+    dropped: int  # notable lines that no longer fit
+    text: str
+    tokens: int
+
+    def __init__(self, start: float, end: float):
+        self.start = start
+        self.end = end
+        self.near = Counter()
+        self.reached = Counter()
+        self.tasks = 0
+        self.chat = Counter()
+        self.other = 0
+        self.notable = []
+        self.dropped = 0
+        self.text = ""
+        self.tokens = 0
+
+    @classmethod
+    def of(cls, entries: list[Entry]) -> "Summary":
+        summary = cls(entries[0].time, entries[-1].time)
+        for entry in entries:
+            summary.add(entry)
+        summary.render()
+        return summary
+
+    def add(self, entry: Entry):
+        if isinstance(entry, Action):
+            if entry.type == "Move":
+                self.reached[entry.details] += 1
+            elif entry.type == "Task":
+                self.tasks += 1
+            elif entry.type in NOTABLE_ACTIONS:
+                self.notable.append(str(entry))
+            else:
+                self.other += 1
+            return
+
+        kind = base_type(entry)
+        if kind in ("seePlayer", "killRange"):
+            self.near[entry.type.partition(":")[2] or entry.details] += 1
+        elif kind == "reachLocation":
+            self.reached[entry.details.removeprefix("you have reached ")] += 1
+        elif kind == "completeTask":
+            self.tasks += 1
+        elif kind == "chatMessage":
+            self.chat[entry.details.partition(":")[0]] += 1
+        elif kind in NOTABLE:
+            self.notable.append(str(entry))
+        else:
+            self.other += 1
+
+    def merge(self, newer: "Summary") -> "Summary":
+        merged = Summary(self.start, newer.end)
+        merged.near = self.near + newer.near
+        merged.reached = self.reached + newer.reached
+        merged.tasks = self.tasks + newer.tasks
+        merged.chat = self.chat + newer.chat
+        merged.other = self.other + newer.other
+        merged.notable = self.notable + newer.notable
+        merged.dropped = self.dropped + newer.dropped
+        merged.render()
+        return merged
+
+    def render(self, max_notable: int = CompactionConfig.MAX_NOTABLE):
+        if len(self.notable) > max_notable:
+            self.dropped += len(self.notable) - max_notable
+            self.notable = self.notable[-max_notable:]
+
+        parts = []
+        if self.near:
+            parts.append(
+                "near " + ", ".join(f"{p} ({n}x)" for p, n in self.near.most_common(5))
+            )
+        if self.reached:
+            parts.append(
+                "went to " + ", ".join(place for place, _ in self.reached.most_common(5))
+            )
+        if self.tasks:
+            parts.append(f"{self.tasks} task events")
+        if self.chat:
+            parts.append(
+                f"{sum(self.chat.values())} chat messages ("
+                + ", ".join(f"{p} {n}" for p, n in self.chat.most_common(5))
+                + ")"
+            )
+        if self.other:
+            parts.append(f"{self.other} other events")
+        text = f"Summary of t={self.start}..{self.end}: " + ("; ".join(parts) or "nothing")
+        if self.notable:
+            text += ". Notable: " + "; ".join(self.notable)
+        if self.dropped:
+            text += f" (+{self.dropped} earlier notable events)"
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+
+class Compactor:
+    """
+    Token-budgeted view of an agent's history for meeting prompts.
+
+    The newest entries stay verbatim; older ones are folded, a chunk at a
+    time, into rule-based summaries, and the oldest summaries are merged
+    together so the summaries never take more than half the budget.
+    refresh() is incremental and cheap to call between meetings.
+
+    The folded range is every entry up to a time, so entries that arrive
+    late and sort into it are added to the summary covering them instead of
+    shifting the range.
+    """
+
+    summaries: list[Summary]
+    folded_until: float  # entries with a time <= this are in the summaries
+    mark: int  # log offset (HistoryStore.mark) of the last refresh
+
+    def __init__(self, config=CompactionConfig):
+        self.config = config
+        self.summaries = []
+        self.folded_until = -inf
+        self.mark = 0
+
+    def refresh(self, store: HistoryStore):
+        late = (
+            [entry for entry in store.since(self.mark) if entry.time <= self.folded_until]
+            if self.summaries
+            else []
+        )
+        for entry in late:
+            summary = next(
+                (s for s in reversed(self.summaries) if s.start <= entry.time),
+                self.summaries[0],
+            )
+            summary.add(entry)
+            summary.render()
+        self.mark = store.mark()
+
+        folded = store.count_until(self.folded_until)
+        boundary = len(store) - self.config.RECENT_ENTRIES
+        while boundary - folded >= self.config.CHUNK_ENTRIES:
+            # Entries at the chunk's last time all go in, so the range ends on a time.
+            end = store.count_until(store[folded + self.config.CHUNK_ENTRIES - 1].time)
+            if end > boundary:
+                break
+            self.summaries.append(Summary.of(store[folded:end]))
+            self.folded_until = self.summaries[-1].end
+            folded = end
+
+        while (
+            len(self.summaries) > 1
+            and sum(s.tokens for s in self.summaries) > self.config.TOKEN_BUDGET // 2
+        ):
+            self.summaries[0:2] = [self.summaries[0].merge(self.summaries[1])]
+
+    def view(self, store: HistoryStore, pending: Sequence[Event] = ()) -> list[str]:
+        """History lines, oldest first, within the token budget."""
+        self.refresh(store)
+        budget = self.config.TOKEN_BUDGET
+        lines: list[str] = []
+        start = store.count_until(self.folded_until)
+        for entry in reversed(store.all(pending=pending, start=start)):
+            line = str(entry)
+            budget -= estimate_tokens(line)
+            if budget < 0:
+                break
+            lines.append(line)
+        for summary in reversed(self.summaries):
+            budget -= summary.tokens
+            if budget < 0:
+                break
+            lines.append(summary.text)
+        lines.reverse()
+        return lines
@@ -7,9 +7,11 @@ def enumerate_with_numbers(items: list[str]) -> str:
 
 
 class Task:
+    __slots__ = ("location", "type", "status")
+
     location: str
     type: Literal["short", "common", "long"]
-    status: Literal["incomplete", "complete"] | None = None
+    status: Literal["incomplete", "complete"] | None
 
     def __init__(
         self,
@@ -190,28 +192,47 @@ EventType = Literal[
 ]
 
 class Event:
+    """
+    One observation. Events are never modified after decoding, so a single
+    instance is shared by every history that records it, and its line is
+    rendered once.
+
+    Special States:
+    - bodyFound: details is a JSON string with "caller", "body", and "alivePlayers" (list of players still alive)
+    - emergencyMeeting: details is a JSON string with "caller" and "alivePlayers" (list of players still alive)
+    Their details are parsed once, into `data`.
+    """
+
+    __slots__ = ("type", "details", "time", "data", "_line")
+
     type: EventType
     details: str
     time: float
+    data: dict | None
+    _line: str | None
 
     def __init__(self, type: EventType, details: str, time: float):
         self.type = type
         self.details = details
         self.time = time
+        self.data = (
+            loads(details.split(";")[0])
+            if type == "bodyFound" or type == "emergencyMeeting"
+            else None
+        )
+        self._line = None
 
     def __str__(self):
-        """
-        Special States:
-        - bodyFound: details is a JSON string with "caller", "body", and "alivePlayers" (list of players still alive)
-        - emergencyMeeting: details is a JSON string with "caller" and "alivePlayers" (list of players still alive)
-        """
+        if self._line is None:
+            self._line = self.render()
+        return self._line
 
+    def render(self) -> str:
+        data = self.data
         if self.type == "bodyFound":
-            data = loads(self.details)
-            return f"{data['caller']} found {data['body']}'s body at t={self.time}. Alive players: {', '.join(data['alivePlayers'])}"
+            return f"{data['caller']} found {data['body']}'s body at t={self.time}. Alive players: {', '.join(data['alivePlayers'])}"  # type: ignore
         elif self.type == "emergencyMeeting":
-            data = loads(self.details)
-            return f"{data['caller']} called an emergency meeting at t={self.time}. Alive players: {', '.join(data['alivePlayers'])}"
+            return f"{data['caller']} called an emergency meeting at t={self.time}. Alive players: {', '.join(data['alivePlayers'])}"  # type: ignore
         return f"{self.details} at t={self.time}"
 
 
@@ -230,19 +251,43 @@ ActionType = Literal[
 ]
 
 class Action:
+    __slots__ = (
+        "type",
+        "details",
+        "time",
+        "interruptedAt",
+        "completedAt",
+        "interruptedBy",
+        "_line",
+    )
+
     type: ActionType
     details: str
     time: float
-    interruptedAt: float | None = None
-    completedAt: float | None = None
-    interruptedBy: Event | None = None
+    interruptedAt: float | None
+    completedAt: float | None
+    interruptedBy: Event | None
 
     def __init__(self, type: ActionType, details: str, time: float = 0.0):
         self.type = type
         self.details = details
         self.time = time
+        self.interruptedAt = None
+        self.completedAt = None
+        self.interruptedBy = None
+
+    def __setattr__(self, name, value):
+        # time, completedAt and interruptedAt all show up in the rendered line
+        object.__setattr__(self, name, value)
+        if name != "_line":
+            object.__setattr__(self, "_line", None)
 
     def __str__(self):
+        if self._line is None:
+            self._line = self.render()
+        return self._line
+
+    def render(self) -> str:
         to_return = ""
         if self.type == "Move":
             to_return += f"You began moving to {self.details}"
@@ -289,6 +334,14 @@ class Action:
 
 
 class AgentState:
+    __slots__ = (
+        "location",
+        "sabotage",
+        "tasks",
+        "imposterInformation",
+        "availableActions",
+    )
+
     location: str
     sabotage: dict[str, bool]
     tasks: list[Task]
@@ -1,125 +1,99 @@
-from json import dumps, loads
-import socket
-from asyncio import gather
-
-from agent.agent import Agent
-from agent.constants import PLAYERS, AgentState, Event, Task
+import asyncio
+from asyncio import StreamReader, StreamWriter, gather
+from time import perf_counter
+
+from agent.agent import Agent, DecisionMode
+from agent.codec import dumps, loads
+from agent.constants import PLAYERS, Event
+from agent.decoding import (
+    AgentBatch,
+    BatchDecodeError,
+    DecodeStats,
+    EventBatch,
+    decode_events,
+)
+from agent.framing import NDJSONFramer
+from agent.history import GameLog
+from agent.meeting import Meeting
 
 
 class DataConfig:
     HOST = "127.0.0.1"
     PORT = 12345
     BUFFER_SIZE = 500000
+    MAX_FRAME_SIZE = 16 * 1024 * 1024
+    # Send each agent's action as its own frame as soon as it is decided,
+    # then a BatchComplete frame; otherwise reply with one array per batch.
+    STREAM_ACTIONS = True
+    # Must match the roles set on the Amongi objects in the Unity scene.
+    IMPOSTERS = ["Pink"]
+    # Seconds a batch may spend on agent decisions while Unity is paused;
+    # agents still thinking after that fall back to a default action.
+    DECISION_BUDGET: float | None = 8.0
+    # Tool calls an agent may chain before falling back.
+    MAX_DECISION_STEPS = 6
+    # "think_first" spends one request on think() before acting; "single_call"
+    # asks for the thought and the action as parallel calls of one request.
+    DECISION_MODE: DecisionMode = "think_first"
 
 
 class DataHandler:
-    agents: dict[str, Agent] = {}
-
-    def __init__(self, config=DataConfig):
-        self.config = config
-
-        self.server_socket: socket.socket = None  # type: ignore
-        self.client_socket: socket.socket = None  # type: ignore
-
-        self._rx_buffer = ""  # IMPORTANT: init buffer for NDJSON
-
-        print("initialized data handler for all agents")
+    """One game: the agents of a single Unity connection and their histories."""
 
-    def create_host(self):
-        if self.server_socket is not None:
-            try:
-                self.server_socket.close()
-            except:
-                pass
-
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((self.config.HOST, self.config.PORT))
-        self.server_socket.listen()
-
-        print(f"listening for connection on {self.config.HOST}:{self.config.PORT}")
+    agents: dict[str, Agent]
+    log: GameLog  # every agent's history, stored once
 
-        self.client_socket, client_address = self.server_socket.accept()
-        print(f"accepted connection from {client_address}")
-        self._rx_buffer = ""  # reset buffer per new connection
+    def __init__(self, config=DataConfig, session_id: int = 0):
+        self.config = config
+        self.session_id = session_id
+        self.agents = {}
+        self.log = GameLog()
+
+        self.reader: StreamReader = None  # type: ignore
+        self.writer: StreamWriter = None  # type: ignore
+        self.framer = NDJSONFramer(max_frame_size=config.MAX_FRAME_SIZE)
+        self.decode_stats = DecodeStats()
+        self.budget_overruns = 0
+        self.missed_votes = 0
+
+        # Batches are handled in their own tasks so the reader keeps draining
+        # the socket; the lock keeps them applied in arrival order.
+        self._batch_lock = asyncio.Lock()
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._compaction: asyncio.Task | None = None
+
+        print(f"[session {session_id}] initialized data handler for all agents")
+
+    def attach(self, reader: StreamReader, writer: StreamWriter):
+        self.reader, self.writer = reader, writer
+        self.framer.reset()  # reset buffer per new connection
+        print(
+            f"[session {self.session_id}] accepted connection from "
+            f"{writer.get_extra_info('peername')}"
+        )
 
-    def initialize_agents(self):
-        imposter = "Pink"
+    def initialize_agents(self, imposters: list[str] | None = None):
+        imposters = list(self.config.IMPOSTERS if imposters is None else imposters)
+        self.log = GameLog()
         for player in PLAYERS:
+            role = "imposter" if player in imposters else "crewmate"
             self.agents[player] = Agent(
-                color=player, role="imposter" if player == imposter else "crewmate"
+                color=player,
+                role=role,
+                other_imposters=[p for p in imposters if p != player],
+                max_steps=self.config.MAX_DECISION_STEPS,
+                decision_mode=self.config.DECISION_MODE,
+                log=self.log,
             )
 
     async def handle_meeting(self, event: Event):
-        details = loads(event.details.split(";")[0])
-        caller = details["caller"]
-        alive_players = details["alivePlayers"]
-        chat_order = [caller] + [p for p in alive_players if p != caller]
-        total_chat_history = []
-
-        for round in range(1, 4):
-            for player in chat_order:
-                message = await self.agents[player].on_request_chat(
-                    body_found=(event.type == "bodyFound"),
-                    question_round=round,
-                    was_reporter=player == caller,
-                )
-                to_send = (
-                    dumps(
-                        {
-                            "type": "Chat",
-                            "details": message,
-                            "time": event.time,
-                            "agent": player,
-                        }
-                    )
-                    + "\n"
-                )  # IMPORTANT: real newline delimiter
-                self.client_socket.sendall(to_send.encode("utf-8"))
-                chatMessage = Event(
-                    type="chatMessage",
-                    details=f"{player}: {message}",
-                    time=event.time,
-                )
-                for agent in self.agents.values():
-                    agent.on_chat_message(chatMessage)
-                total_chat_history.append(chatMessage)
-
-        votes = []
-
-        for agent_id in alive_players:
-            agent = self.agents[agent_id]
-            vote = await agent.on_vote()
-            votes.append(vote)
-            for a in self.agents.values():
-                a.event_history.append(
-                    Event(
-                        type="vote",
-                        details=f"{agent.color} voted {vote}",
-                        time=event.time,
-                    )
-                )
-
-        greatest_vote = max(set(votes), key=votes.count)
-
-        to_send = (
-            dumps(
-                {
-                    "type": "Vote",
-                    "details": greatest_vote,
-                    "time": event.time,
-                    "agent": "Red",  # Ignore
-                }
-            )
-            + "\n"
-        )  # IMPORTANT: real newline delimiter
-        self.client_socket.sendall(to_send.encode("utf-8"))
-
-        for agent in self.agents.values():
-            agent.chat_history += total_chat_history
+        meeting = Meeting(event, self.agents, self.log, self.send)
+        tally = await meeting.run()
+        self.missed_votes += sum(ballot.missed for ballot in meeting.ballots)
+        print(f"[session {self.session_id}] meeting votes {tally.counts}, result {tally.result}")
 
     async def main_loop(self):
-        actions = await self.receive_events(
+        batch = decode_events(
             [
                 {
                     "agent": agent,
@@ -139,97 +113,139 @@ class DataHandler:
                     },
                 }
                 for agent in self.agents.keys()
-            ]
+            ],
+            self.agents,
+            self.decode_stats,
         )
-        self.send_actions(actions)
+        await self.handle_batch(batch)
         while True:
-            chunk = self.client_socket.recv(self.config.BUFFER_SIZE).decode("utf-8")
+            chunk = await self.reader.read(self.config.BUFFER_SIZE)
             if not chunk:
-                print("handle_client: no data received, closing connection.")
-                self.client_socket.close()
+                print(
+                    f"[session {self.session_id}] handle_client: no data received, "
+                    "closing connection."
+                )
                 break
 
-            self._rx_buffer += chunk
+            self.framer.feed(chunk)
 
             # NDJSON: process complete lines
-            while "\n" in self._rx_buffer:
-                line, self._rx_buffer = self._rx_buffer.split("\n", 1)
-                line = line.strip()
-                if not line:
-                    continue
-
-                data: dict = loads(line)
-
-                if data.get("type") == "requestChat":
-                    print(f"Received chat request: {data}")
-                elif data.get("type") == "events":
-                    actions = await self.receive_events(data["events"])
-                    self.send_actions(actions)
-
-    async def receive_events(self, events: list[dict]) -> list[dict]:
-        events.sort(key=lambda e: e["event"]["time"])
-        events_by_agent = {agent: [] for agent in self.agents.keys()}
-        for event in events:
-            events_by_agent[event["agent"]].append(event)
-        agent_states = {
-            agent: {} for agent in self.agents.keys() if events_by_agent[agent]
-        }
-        for agent, agent_events in events_by_agent.items():
-            if agent_events:
-                agent_states[agent] = agent_events[-1]["state"]
+            try:
+                for frame in self.framer.frames():
+                    self.handle_frame(frame)
+            except ValueError as e:
+                print(f"[session {self.session_id}] handle_client: {e}, closing connection.")
+                break
 
-        actions = await gather(
-            *[
-                self.agents[agent].on_event(
-                    [
-                        Event(
-                            type=event["event"]["type"],
-                            details=event["event"]["details"],
-                            time=event["event"]["time"],
-                        )
-                        for event in events_by_agent[agent]
-                    ],
-                    AgentState(
-                        location=agent_states[agent]["location"],
-                        sabotage=agent_states[agent].get("sabotage", {}),
-                        tasks=[
-                            Task(
-                                location=task["location"],
-                                type=task["type"],
-                                status=task.get("status"),
-                            )
-                            for task in agent_states[agent].get("tasks", [])
-                        ],
-                        imposterInformation=agent_states[agent].get(
-                            "imposterInformation", {}
-                        ),
-                        availableActions=agent_states[agent].get(
-                            "availableActions", []
-                        ),
-                    ),
-                )
-                for agent in agent_states.keys()
-            ]
-        )
+        if self._batch_tasks:
+            await gather(*self._batch_tasks, return_exceptions=True)
+        self.writer.close()
+        await self.writer.wait_closed()
 
-        print([event["event"]["type"] for event in events])
+    def handle_frame(self, frame: memoryview) -> None:
+        start = perf_counter()
+        data: dict = loads(frame)
+        self.decode_stats.parse_seconds += perf_counter() - start
 
+        if data.get("type") == "requestChat":
+            print(f"Received chat request: {data}")
+        elif data.get("type") == "events":
+            try:
+                batch = decode_events(data["events"], self.agents, self.decode_stats)
+            except BatchDecodeError as e:
+                print(f"Dropping malformed events frame: {e}")
+                batch = EventBatch([], {})  # still answered, so Unity resumes
+            task = asyncio.create_task(self.handle_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def handle_batch(self, batch: EventBatch) -> None:
+        async with self._batch_lock:
+            try:
+                actions = await self.receive_events(batch)
+            except Exception as e:
+                print(f"Error in receive_events: {e}")
+                actions = []  # still answer so Unity resumes time
+            if self.config.STREAM_ACTIONS:
+                await self.send({"type": "BatchComplete"})
+            else:
+                await self.send_actions(actions)
+        self.schedule_compaction()
+
+    def schedule_compaction(self) -> None:
+        # Runs once Unity has resumed, so meeting prompts only find a few
+        # entries left to fold.
+        if self._compaction is None or self._compaction.done():
+            self._compaction = asyncio.create_task(self.compact_histories())
+            self._batch_tasks.add(self._compaction)
+            self._compaction.add_done_callback(self._batch_tasks.discard)
+
+    async def compact_histories(self) -> None:
+        for agent in list(self.agents.values()):
+            agent.compactor.refresh(agent.history)
+            await asyncio.sleep(0)
+
+    async def decide(
+        self, agent: str, agent_batch: AgentBatch, stream: bool, deadline: float | None
+    ) -> dict | None:
+        step_overruns = self.agents[agent].step_overruns
+        decision = self.agents[agent].on_event(agent_batch.events, agent_batch.state)
+        if deadline is None:
+            action = await decision
+        else:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    action = await decision
+            except TimeoutError:
+                self.budget_overruns += 1
+                print(f"[session {self.session_id}] {agent} ran out of decision budget")
+                action = self.agents[agent].fallback_action(
+                    agent_batch.events, agent_batch.state
+                )
+        if self.agents[agent].step_overruns > step_overruns:
+            print(f"[session {self.session_id}] {agent} ran out of decision steps")
+        if action is None:
+            return None
+        action = dict(action.__dict__(), agent=agent)
+        if stream:
+            await self.send(action)
+            return None
+        return action
+
+    async def receive_events(self, batch: EventBatch) -> list[dict]:
+        """
+        Run every agent with events in the batch and collect their actions.
+
+        When actions are streamed they are sent as each agent finishes and the
+        returned list is empty. Batches that start a meeting never produce
+        actions.
+        """
         meeting_events = [
             event
-            for event in events
-            if event["event"]["type"] in ["bodyFound", "emergencyMeeting"]
+            for _, event in batch.events
+            if event.type in ["bodyFound", "emergencyMeeting"]
         ]
+        stream = self.config.STREAM_ACTIONS and not meeting_events
+        deadline = (
+            None
+            if self.config.DECISION_BUDGET is None
+            else asyncio.get_running_loop().time() + self.config.DECISION_BUDGET
+        )
 
-        if meeting_events:
-            alive_players = loads(meeting_events[-1]["event"]["details"].split(";")[0])[
-                "alivePlayers"
-            ]
-            history = list(reversed(self.agents[alive_players[0]].event_history))
-            last_meeting_related_events = [
-                event
-                for event in history
-                if event.type in ["bodyFound", "emergencyMeeting", "meetingEnd"]
+        actions = await gather(
+            *[
+                self.decide(agent, agent_batch, stream, deadline)
+                for agent, agent_batch in batch.agents.items()
             ]
+        )
+
+        print([event.type for _, event in batch.events])
+
+        if meeting_events:
+            alive_players = meeting_events[-1].data["alivePlayers"]  # type: ignore
+            last_meeting_related_events = self.agents[
+                alive_players[0]
+            ].history.latest_own(["bodyFound", "emergencyMeeting", "meetingEnd"], 2)
             if (
                 len(last_meeting_related_events) > 1
                 and last_meeting_related_events[1].type != "meetingEnd"
@@ -238,24 +254,17 @@ class DataHandler:
                 # So we don't handle it here, since it's a new meeting that hasn't ended yet
                 return []
 
-            await self.handle_meeting(
-                Event(
-                    type=meeting_events[-1]["event"]["type"],
-                    details=meeting_events[-1]["event"]["details"],
-                    time=meeting_events[-1]["event"]["time"],
-                )
-            )
+            await self.handle_meeting(meeting_events[-1])
             return []
 
-        return [
-            dict(action.__dict__(), agent=agent)
-            for action, agent in zip(actions, agent_states.keys())
-            if action is not None
-        ]
+        return [action for action in actions if action is not None]
+
+    async def send(self, payload: dict | list) -> None:
+        self.writer.write(dumps(payload) + b"\n")  # IMPORTANT: real newline delimiter
+        await self.writer.drain()
 
-    def send_actions(self, actions: list[dict]) -> None:
+    async def send_actions(self, actions: list[dict]) -> None:
         try:
-            to_send = dumps(actions) + "\n"  # IMPORTANT: real newline delimiter
-            self.client_socket.sendall(to_send.encode("utf-8"))
+            await self.send(actions)
         except Exception as e:
             print(f"Error in play_state: {e}")
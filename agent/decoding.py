@@ -0,0 +1,239 @@
+from sys import intern
+from time import perf_counter
+from typing import Any, Iterable, NoReturn
+
+from agent.constants import AgentState, Event, Task
+
+# field -> (accepted types, required)
+Schema = dict[str, tuple[type | tuple[type, ...], bool]]
+
+ENVELOPE_SCHEMA: Schema = {
+    "agent": (str, True),
+    "event": (dict, True),
+    "state": (dict, False),
+}
+EVENT_SCHEMA: Schema = {
+    "type": (str, True),
+    "details": (str, True),
+    "time": ((int, float), True),
+}
+STATE_SCHEMA: Schema = {
+    "location": (str, True),
+    "sabotage": (dict, False),
+    "tasks": (list, False),
+    "imposterInformation": (dict, False),
+    "availableActions": (list, False),
+}
+TASK_SCHEMA: Schema = {
+    "location": (str, True),
+    "type": (str, True),
+    "status": (str, False),
+}
+
+
+MEETING_EVENTS = {"bodyFound", "emergencyMeeting"}  # details carry JSON
+
+
+class BatchDecodeError(ValueError):
+    pass
+
+
+def validate(obj: Any, schema: Schema, where: str, key: object = None) -> dict:
+    """Return `obj` if it matches `schema`; `where` is formatted with `key` for errors."""
+    if not isinstance(obj, dict):
+        raise BatchDecodeError(
+            f"{where.format(key)}: expected an object, got {type(obj).__name__}"
+        )
+    for field, (types, required) in schema.items():
+        value = obj.get(field)
+        if value is None:
+            if required:
+                raise BatchDecodeError(f"{where.format(key)}: missing '{field}'")
+        elif not isinstance(value, types):
+            raise BatchDecodeError(
+                f"{where.format(key)}: '{field}' has type {type(value).__name__}"
+            )
+    return obj
+
+
+def reject(obj: Any, schema: Schema, where: str, key: object) -> NoReturn:
+    """Raise the error for `obj`, which an inline check found not to match `schema`."""
+    validate(obj, schema, where, key)
+    raise BatchDecodeError(f"{where.format(key)}: does not match its schema")
+
+
+# The decoders below check fields inline, mirroring the schemas above, and
+# only go through validate() to explain a failure: a generic loop over the
+# schemas costs more than parsing the frame. JSON only produces the exact
+# builtin types, so the hot loop compares classes instead of isinstance().
+
+
+# Tasks are never modified after decoding and a game only has a few dozen
+# (location, type, status) combinations, so each one is built once and shared.
+TASK_CACHE_SIZE = 1024
+_tasks: dict[tuple[str, str, str | None], Task] = {}
+
+
+def decode_task(raw: Any, index: int) -> Task:
+    if not (
+        isinstance(raw, dict)
+        and isinstance(location := raw.get("location"), str)
+        and isinstance(kind := raw.get("type"), str)
+        and ((status := raw.get("status")) is None or isinstance(status, str))
+    ):
+        reject(raw, TASK_SCHEMA, "tasks[{}]", index)
+    key = (location, kind, status)
+    task = _tasks.get(key)
+    if task is None:
+        task = Task(
+            location=intern(location),
+            type=intern(kind),
+            status=intern(status) if status is not None else None,
+        )
+        if len(_tasks) < TASK_CACHE_SIZE:
+            _tasks[key] = task
+    return task
+
+
+def decode_state(raw: Any, agent: str) -> AgentState:
+    if not (
+        isinstance(raw, dict)
+        and isinstance(location := raw.get("location"), str)
+        and ((sabotage := raw.get("sabotage")) is None or isinstance(sabotage, dict))
+        and ((tasks := raw.get("tasks")) is None or isinstance(tasks, list))
+        and ((info := raw.get("imposterInformation")) is None or isinstance(info, dict))
+        and ((actions := raw.get("availableActions")) is None or isinstance(actions, list))
+    ):
+        reject(raw, STATE_SCHEMA, "state of {}", agent)
+    try:
+        tasks = [decode_task(task, i) for i, task in enumerate(tasks)] if tasks else []
+    except BatchDecodeError as e:
+        raise BatchDecodeError(f"state of {agent}.{e}") from None
+    return AgentState(
+        location=intern(location),
+        sabotage=sabotage or {},
+        tasks=tasks,
+        imposterInformation=info or {},
+        availableActions=(
+            [intern(action) if action.__class__ is str else action for action in actions]
+            if actions
+            else []
+        ),
+    )
+
+
+class AgentBatch:
+    events: list[Event]
+    state: AgentState
+
+    def __init__(self, events: list[Event], state: AgentState):
+        self.events = events
+        self.state = state
+
+
+class EventBatch:
+    events: list[tuple[str, Event]]
+    agents: dict[str, AgentBatch]
+
+    def __init__(self, events: list[tuple[str, Event]], agents: dict[str, AgentBatch]):
+        self.events = events
+        self.agents = agents
+
+
+class DecodeStats:
+    batches: int
+    events: int
+    parse_seconds: float
+    decode_seconds: float
+
+    def __init__(self):
+        self.batches = 0
+        self.events = 0
+        self.parse_seconds = 0.0
+        self.decode_seconds = 0.0
+
+    def __str__(self):
+        if not self.batches:
+            return "no batches decoded"
+        return (
+            f"{self.batches} batches, {self.events} events, "
+            f"parse {self.parse_seconds / self.batches * 1e6:.0f}us/batch, "
+            f"decode {self.decode_seconds / self.batches * 1e6:.0f}us/batch"
+        )
+
+
+def event_time(pair: tuple[str, Event]) -> float:
+    return pair[1].time
+
+
+def decode_events(
+    entries: list, players: Iterable[str], stats: DecodeStats | None = None
+) -> EventBatch:
+    """
+    Validate the entries of an `events` frame and group them by agent.
+
+    Events come back sorted by time, both overall and per agent. Each agent's
+    state is taken from its latest event that carries one, and only that
+    one is decoded.
+    """
+    start = perf_counter()
+    if not isinstance(entries, list):
+        raise BatchDecodeError("events: expected a list")
+
+    players = list(players)
+    known = {player: player for player in players}  # maps to the shared key object
+    decoded: list[tuple[str, Event]] = []
+    latest_state: dict[str, Any] = {}
+    state_time: dict[str, float] = {}
+    for i, entry in enumerate(entries):
+        if not (
+            entry.__class__ is dict
+            and (name := entry.get("agent")).__class__ is str
+            and (raw := entry.get("event")).__class__ is dict
+            and ((state := entry.get("state")) is None or state.__class__ is dict)
+        ):
+            reject(entry, ENVELOPE_SCHEMA, "events[{}]", i)
+        agent = known.get(name)
+        if agent is None:
+            raise BatchDecodeError(f"events[{i}]: unknown agent '{name}'")
+        if not (
+            (kind := raw.get("type")).__class__ is str
+            and (details := raw.get("details")).__class__ is str
+        ):
+            reject(raw, EVENT_SCHEMA, "events[{}].event", i)
+        if (time := raw.get("time")).__class__ is not float:
+            if time.__class__ is not int:
+                reject(raw, EVENT_SCHEMA, "events[{}].event", i)
+            time = float(time)
+        try:
+            event = Event(type=intern(kind), details=details, time=time)
+        except ValueError as e:  # meeting details that are not JSON
+            raise BatchDecodeError(f"events[{i}].event: bad details ({e})") from None
+        if event.type in MEETING_EVENTS and not isinstance(event.data, dict):
+            raise BatchDecodeError(f"events[{i}].event: details must be a JSON object")
+        decoded.append((agent, event))
+        # Ties go to the later entry, as they would after the stable sort.
+        if state is not None and time >= state_time.get(agent, time):
+            state_time[agent] = time
+            latest_state[agent] = state
+    decoded.sort(key=event_time)
+
+    grouped: dict[str, list[Event]] = {player: [] for player in players}
+    for agent, event in decoded:
+        grouped[agent].append(event)
+
+    agents: dict[str, AgentBatch] = {}
+    for player in players:
+        if grouped[player]:
+            if player not in latest_state:
+                raise BatchDecodeError(f"state of {player}: no event carries one")
+            agents[player] = AgentBatch(
+                grouped[player],
+                decode_state(latest_state[player], player),
+            )
+
+    if stats is not None:
+        stats.batches += 1
+        stats.events += len(decoded)
+        stats.decode_seconds += perf_counter() - start
+    return EventBatch(decoded, agents)
@@ -0,0 +1,64 @@
+from typing import Iterator
+
+
+class NDJSONFramer:
+    """
+    Incremental splitter for newline-delimited frames read off a byte stream.
+
+    Bytes are appended to a single bytearray and delimiters are searched from
+    where the previous scan stopped, so every byte is looked at once no matter
+    how many frames arrive in one read. Frames are only decoded once they are
+    complete, which keeps multi-byte UTF-8 characters split across reads intact.
+
+    Frames are yielded as memoryview slices into the internal buffer. They are
+    valid until the next call to feed().
+    """
+
+    def __init__(self, delimiter: bytes = b"\n", max_frame_size: int | None = None):
+        self.delimiter = delimiter
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        self._start = 0  # first byte of the frame currently being assembled
+        self._scan = 0  # where the next delimiter search begins
+
+    def __len__(self) -> int:
+        return len(self._buffer) - self._start
+
+    def feed(self, data: bytes) -> None:
+        try:
+            del self._buffer[: self._start]
+            self._buffer += data
+        except BufferError:
+            # A yielded frame is still referenced, so the buffer cannot be
+            # resized in place; move the unconsumed tail to a fresh one.
+            self._buffer = self._buffer[self._start :] + data
+        self._scan -= self._start
+        self._start = 0
+
+    def frames(self) -> Iterator[memoryview]:
+        view = memoryview(self._buffer)
+        try:
+            while True:
+                end = self._buffer.find(self.delimiter, self._scan)
+                if end < 0:
+                    # a multi-byte delimiter may be split across reads
+                    self._scan = max(
+                        self._start, len(self._buffer) - len(self.delimiter) + 1
+                    )
+                    break
+                start = self._start
+                self._start = self._scan = end + len(self.delimiter)
+                if end > start:
+                    yield view[start:end]
+        finally:
+            view.release()
+
+        if self.max_frame_size is not None and len(self) > self.max_frame_size:
+            raise ValueError(
+                f"frame exceeds {self.max_frame_size} bytes without a delimiter"
+            )
+
+    def reset(self) -> None:
+        self._buffer = bytearray()
+        self._start = 0
+        self._scan = 0
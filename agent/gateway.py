@@ -0,0 +1,272 @@
+import asyncio
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from random import uniform
+from time import perf_counter
+
+from agent.backends import LLMBackend, MockBackend, OpenAIBackend
+from agent.compaction import estimate_tokens
+from agent.ratelimit import RateController, RateLimitConfig
+from agent.scheduler import PriorityLimiter, SchedulerConfig
+
+
+class GatewayConfig:
+    BACKEND = "openai"  # or "mock"; the LLM_BACKEND environment variable wins
+    MODEL = "gpt-4.1-mini"
+    MAX_IN_FLIGHT = 16  # the most concurrent requests the rate controller may allow
+    MAX_CONNECTIONS = 32
+    MAX_KEEPALIVE_CONNECTIONS = 32
+    KEEPALIVE_EXPIRY = 60.0
+    TIMEOUT = 30.0  # seconds per attempt
+    MAX_RETRIES = 4
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 8.0
+
+
+class GatewayStats:
+    calls: int
+    errors: int
+    retries: int
+    timeouts: int
+    status_counts: dict[int, int]
+    latencies: deque[float]
+    first_tokens: deque[float]  # time to the first delta of streamed calls
+    queue_waits: dict[int, deque[float]]  # per scheduling level
+
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.status_counts = {}
+        self.latencies = deque(maxlen=window)
+        self.first_tokens = deque(maxlen=window)
+        self.queue_waits = {}
+        self.window = window
+
+    def queued(self, level: int, seconds: float):
+        if level not in self.queue_waits:
+            self.queue_waits[level] = deque(maxlen=self.window)
+        self.queue_waits[level].append(seconds)
+
+    def percentile(self, q: float, samples: deque[float] | None = None) -> float:
+        samples = self.latencies if samples is None else samples
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "status_counts": dict(self.status_counts),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "first_token_p50": self.percentile(0.5, self.first_tokens),
+            "queue_p95": {
+                level: self.percentile(0.95, waits)
+                for level, waits in sorted(self.queue_waits.items())
+            },
+        }
+
+    def __str__(self):
+        return (
+            f"{self.calls} calls, {self.errors} errors, {self.retries} retries, "
+            f"{self.timeouts} timeouts, p50 {self.percentile(0.5):.2f}s, "
+            f"p95 {self.percentile(0.95):.2f}s"
+        )
+
+
+class LLMGateway:
+    """
+    Process-wide entry point for chat completions.
+
+    Every agent in every session shares one backend, and so one keep-alive
+    connection pool. The gateway caps in-flight requests at the rate
+    controller's window and keeps every call within its request and token
+    budgets (see agent.ratelimit), starts queued calls by urgency (the
+    `priority` argument, see agent.scheduler), retries 429s and 5xx
+    responses with jittered exponential backoff, and keeps latency and
+    error counters.
+    """
+
+    def __init__(
+        self,
+        config=GatewayConfig,
+        backend: LLMBackend | None = None,
+        rate_config=RateLimitConfig,
+    ):
+        self.config = config
+        self.stats = GatewayStats()
+        self._backend = backend
+        self.rate = RateController(config.MAX_IN_FLIGHT, rate_config)
+        self._limiter = PriorityLimiter(self.rate.limit)
+
+    @property
+    def backend(self) -> LLMBackend:
+        if self._backend is None:
+            self._backend = make_backend(
+                os.environ.get("LLM_BACKEND", self.config.BACKEND), self.config
+            )
+        return self._backend
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = self.backend.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.config.BACKOFF_MAX)
+        ceiling = min(self.config.BACKOFF_MAX, self.config.BACKOFF_BASE * 2**attempt)
+        return uniform(0, ceiling)  # full jitter
+
+    async def complete(self, priority: int = SchedulerConfig.DEFAULT_LEVEL, **kwargs):
+        kwargs.setdefault("model", self.config.MODEL)
+        async with self.slot(priority):
+            attempt = 0
+            while True:
+                reserved = await self.rate.reserve(self.estimate(kwargs))
+                start = perf_counter()
+                try:
+                    response = await self.backend.complete(**kwargs)
+                except Exception as e:
+                    self.rate.settle(reserved, 0)
+                    if not self.should_retry(attempt, e):
+                        raise
+                    await asyncio.sleep(self.backoff(attempt, e))
+                    attempt += 1
+                    continue
+                self.rate.settle(reserved, used_tokens(response.usage, reserved))
+                self.succeeded(perf_counter() - start)
+                return response
+
+    async def stream(self, priority: int = SchedulerConfig.DEFAULT_LEVEL, **kwargs):
+        """
+        complete() for plain text, as (delta, usage) pairs as they arrive;
+        usage comes with the last pair. Only failures before the first
+        delta are retried.
+        """
+        kwargs.setdefault("model", self.config.MODEL)
+        async with self.slot(priority):
+            attempt = 0
+            while True:
+                reserved = await self.rate.reserve(self.estimate(kwargs))
+                start = perf_counter()
+                started = False
+                used = 0
+                try:
+                    async for delta, usage in self.backend.stream(**kwargs):
+                        if not started:
+                            started = True
+                            self.stats.first_tokens.append(perf_counter() - start)
+                        if usage is not None:
+                            used = used_tokens(usage, reserved)
+                        yield delta, usage
+                except Exception as e:
+                    self.rate.settle(reserved, (used or reserved) if started else 0)
+                    if started or not self.should_retry(attempt, e):
+                        if started:
+                            self.stats.errors += 1
+                        raise
+                    await asyncio.sleep(self.backoff(attempt, e))
+                    attempt += 1
+                    continue
+                self.rate.settle(reserved, used or reserved)
+                self.succeeded(perf_counter() - start)
+                return
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        queued = perf_counter()
+        async with self._limiter.slot(priority):
+            self.stats.queued(priority, perf_counter() - queued)
+            yield
+
+    def estimate(self, kwargs: dict) -> int:
+        """Tokens a call may use: its prompt and at most its completion limit."""
+        prompt = sum(
+            estimate_tokens(str(message.get("content") or "")) for message in kwargs["messages"]
+        )
+        if kwargs.get("tools"):
+            prompt += tools_tokens(kwargs["tools"])
+        completion = (
+            kwargs.get("max_completion_tokens") or self.rate.config.EXPECTED_COMPLETION_TOKENS
+        )
+        return prompt + completion
+
+    def succeeded(self, latency: float):
+        self.stats.calls += 1
+        self.stats.latencies.append(latency)
+        self.rate.succeeded(latency)
+        self._limiter.resize(self.rate.limit)
+
+    def snapshot(self) -> dict:
+        return dict(self.stats.snapshot(), budget=self.rate.budget())
+
+    def should_retry(self, attempt: int, error: Exception) -> bool:
+        """Count a failed attempt; False once it should be raised."""
+        if self.backend.is_timeout(error):
+            self.stats.timeouts += 1
+        code = self.backend.status_code(error)
+        if code is not None:
+            self.stats.status_counts[code] = self.stats.status_counts.get(code, 0) + 1
+        if code == 429:
+            self.rate.throttled(self.backend.retry_after(error))
+            self._limiter.resize(self.rate.limit)
+        if attempt >= self.config.MAX_RETRIES or not self.backend.is_retryable(error):
+            self.stats.errors += 1
+            return False
+        self.stats.retries += 1
+        return True
+
+
+def used_tokens(usage, estimate: int) -> int:
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        prompt = getattr(usage, "prompt_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+        if prompt is None or completion is None:
+            return estimate
+        total = prompt + completion
+    return total
+
+
+# id -> (tools, tokens); holding the tuple keeps its id from being reused.
+_tools_tokens: dict[int, tuple[tuple, int]] = {}
+
+
+def tools_tokens(tools) -> int:
+    """
+    estimate_tokens() of a `tools` list. The shared tuples from
+    Agent._tools_for are measured once, not on every call and retry.
+    """
+    if tools.__class__ is not tuple:
+        return estimate_tokens(str(tools))
+    cached = _tools_tokens.get(id(tools))
+    if cached is None:
+        cached = _tools_tokens[id(tools)] = (tools, estimate_tokens(str(tools)))
+    return cached[1]
+
+
+def make_backend(name: str, config=GatewayConfig) -> LLMBackend:
+    if name == "mock":
+        return MockBackend()
+    if name == "openai":
+        return OpenAIBackend(
+            timeout=config.TIMEOUT,
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.KEEPALIVE_EXPIRY,
+        )
+    raise ValueError(f"unknown LLM backend {name!r}")
+
+
+_gateway: LLMGateway | None = None
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
@@ -0,0 +1,203 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from operator import attrgetter
+from typing import Iterable, Iterator, Sequence
+
+from agent.constants import Action, Event
+
+Entry = Event | Action
+
+by_time = attrgetter("time")
+
+
+class GameLog:
+    """
+    Every history entry of one game, stored once, in arrival order.
+
+    Entries only one agent sees (its events and actions) are indexed by that
+    agent's HistoryStore. Broadcast entries (meeting chat and votes) are
+    indexed here, once, and every store of the game reads them from here, so
+    they cost the same however many players there are.
+    """
+
+    _entries: list[Entry]
+    _public: array  # offsets of broadcast entries, in time order
+
+    def __init__(self):
+        self._entries = []
+        self._public = array("q")
+
+    def append(self, entry: Entry) -> int:
+        self._entries.append(entry)
+        return len(self._entries) - 1
+
+    def broadcast(self, entry: Entry) -> int:
+        """Append an entry every agent of the game sees."""
+        offset = self.append(entry)
+        self.insert(self._public, offset)
+        return offset
+
+    def insert(self, offsets: array, offset: int):
+        """Add `offset` to a time-ordered array of offsets into this log."""
+        # Entries almost always arrive in order and are appended; late ones go
+        # after every entry with the same time.
+        entries = self._entries
+        time = entries[offset].time
+        if not offsets or time >= entries[offsets[-1]].time:
+            offsets.append(offset)
+        else:
+            offsets.insert(bisect_right(offsets, time, key=self.time_of), offset)
+
+    def time_of(self, offset: int) -> float:
+        return self._entries[offset].time
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HistoryStore:
+    """
+    One agent's view of its game's log: its own events and actions plus
+    every broadcast entry, in time order.
+
+    The view holds offsets into the log, not entries, and merges the two
+    streams as it is read (the agent's own entries first on equal times).
+    Reading the last k entries never touches the rest of the game. A store
+    made without a log gets a log of its own.
+    """
+
+    _log: GameLog
+    _offsets: array  # this agent's entries, in time order
+
+    def __init__(self, log: GameLog | None = None):
+        self._log = log if log is not None else GameLog()
+        self._offsets = array("q")
+
+    def add(self, entry: Entry):
+        self._log.insert(self._offsets, self._log.append(entry))
+
+    def extend(self, entries: Sequence[Entry]):
+        for entry in entries:
+            self.add(entry)
+
+    def _split(self, i: int) -> tuple[int, int]:
+        """How many own and broadcast entries come before merged position i."""
+        own, public, time = self._offsets, self._log._public, self._log.time_of
+        lo = max(0, i - len(public))
+        hi = min(i, len(own))
+        while lo < hi:
+            p = (lo + hi) // 2
+            q = i - p
+            if q > 0 and p < len(own) and time(public[q - 1]) >= time(own[p]):
+                lo = p + 1
+            else:
+                hi = p
+        return lo, i - lo
+
+    def _range(self, p: int, q: int, p_end: int, q_end: int) -> list[Entry]:
+        entries = self._log._entries
+        own, public = self._offsets, self._log._public
+        if q == q_end:
+            return [entries[offset] for offset in own[p:p_end]]
+        out = []
+        while p < p_end and q < q_end:
+            mine, theirs = entries[own[p]], entries[public[q]]
+            if mine.time <= theirs.time:
+                out.append(mine)
+                p += 1
+            else:
+                out.append(theirs)
+                q += 1
+        out += [entries[offset] for offset in own[p:p_end]]
+        out += [entries[offset] for offset in public[q:q_end]]
+        return out
+
+    def last(self, k: int, pending: Sequence[Entry] = ()) -> list[Entry]:
+        """The latest k entries, merged with `pending` (sorted by time)."""
+        if k <= 0:
+            return []
+        recent = self[-k:]
+        if not pending:
+            return recent
+        return list(merge(recent, pending[-k:], key=by_time))[-k:]
+
+    def all(self, pending: Sequence[Entry] = (), start: int = 0) -> list[Entry]:
+        entries = self[start:]
+        if not pending:
+            return entries
+        return list(merge(entries, pending, key=by_time))
+
+    def between(self, start: float, end: float) -> list[Entry]:
+        """Entries with start <= time <= end."""
+        own, public, time = self._offsets, self._log._public, self._log.time_of
+        return self._range(
+            bisect_left(own, start, key=time),
+            bisect_left(public, start, key=time),
+            bisect_right(own, end, key=time),
+            bisect_right(public, end, key=time),
+        )
+
+    def count_until(self, time: float) -> int:
+        """How many entries have a time <= `time`; they are the first ones."""
+        key = self._log.time_of
+        return bisect_right(self._offsets, time, key=key) + bisect_right(
+            self._log._public, time, key=key
+        )
+
+    def mark(self) -> int:
+        """The log's current end, to pass to since() later."""
+        return len(self._log)
+
+    def since(self, mark: int) -> list[Entry]:
+        """This view's entries appended to the log from offset `mark` on, in arrival order."""
+        entries = self._log._entries
+        if mark >= len(entries):
+            return []
+        # Offsets are kept in time order, so scanning back can stop below the
+        # earliest time appended since the mark.
+        floor = min(entry.time for entry in entries[mark:])
+        found = []
+        for offsets in (self._offsets, self._log._public):
+            for offset in reversed(offsets):
+                if entries[offset].time < floor:
+                    break
+                if offset >= mark:
+                    found.append(offset)
+        return [entries[offset] for offset in sorted(found)]
+
+    def latest_own(self, types: Iterable[str], k: int) -> list[Entry]:
+        """This agent's newest k entries of the given types, newest first."""
+        types = set(types)
+        entries = self._log._entries
+        found = []
+        for offset in reversed(self._offsets):
+            entry = entries[offset]
+            if entry.type in types:
+                found.append(entry)
+                if len(found) == k:
+                    break
+        return found
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("HistoryStore slices must be contiguous")
+            if start >= stop:
+                return []
+            if not self._log._public:
+                return self._range(start, 0, stop, 0)
+            return self._range(*self._split(start), *self._split(stop))
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("HistoryStore index out of range")
+        return self._range(*self._split(index), *self._split(index + 1))[0]
+
+    def __len__(self):
+        return len(self._offsets) + len(self._log._public)
+
+    def __iter__(self) -> Iterator[Entry]:
+        return iter(self[:])
@@ -1,5 +1,6 @@
 from typing import Callable, Literal
-from agent.constants import ALL_VENTS, LOCATION_GRAPH, Action
+from agent.constants import Action
+from agent.mapindex import TRAVEL, VENT_INDEX
 
 
 def getFastestPath(start: str, end: str) -> list[str]:
@@ -13,30 +14,7 @@ def getFastestPath(start: str, end: str) -> list[str]:
     Returns:
       a list of locations representing the path from start to end.
     """
-
-    visited = set()
-    queue = [[start]]
-
-    if start == end:
-        return [start]
-
-    while queue:
-        path = queue.pop(0)
-        current = path[-1]
-
-        if current in visited:
-            continue
-
-        visited.add(current)
-
-        neighbors = LOCATION_GRAPH.get(current, set())
-        for neighbor in neighbors:
-            if neighbor == end:
-                return path + [neighbor]
-            if neighbor not in visited:
-                queue.append(path + [neighbor])
-
-    return []
+    return TRAVEL.path(start, end)
 
 
 def findClosestVent(location: str) -> str:
@@ -49,22 +27,8 @@ def findClosestVent(location: str) -> str:
     Returns:
       the name of the closest vent and the distance to it.
     """
-    visited = set()
-    queue = [(location, 0)]
-
-    while queue:
-        current, distance = queue.pop(0)
-        if current in visited:
-            continue
-        visited.add(current)
-        if current in ALL_VENTS:
-            return current
-        neighbors = LOCATION_GRAPH.get(current, set())
-        for neighbor in neighbors:
-            if neighbor not in visited:
-                queue.append((neighbor, distance + 1))
-
-    return ""
+    closest = VENT_INDEX.closest(location)
+    return closest[0] if closest else ""
 
 
 def think(new_thought: str):
@@ -0,0 +1,158 @@
+from math import inf
+from pathlib import Path
+
+from agent.codec import loads
+from agent.constants import VENTS
+from agent.waypoints import TRAVEL_TIMES
+
+
+class TravelTable:
+    """
+    All-pairs travel times, in seconds, over the exported waypoint graph.
+
+    Edge lengths come from the scene (see agent.waypoints) and are divided
+    by the agents' walking speed. Built with Floyd-Warshall; every query is a
+    table lookup.
+    """
+
+    locations: list[str]
+    index: dict[str, int]
+    seconds: list[list[float]]  # inf when unreachable
+    paths: list[list[tuple[str, ...]]]
+
+    def __init__(self, edges: list[tuple[str, str, float]]):
+        self.locations = sorted({a for a, _, _ in edges} | {b for _, b, _ in edges})
+        self.index = {location: i for i, location in enumerate(self.locations)}
+        n = len(self.locations)
+        seconds = [[inf] * n for _ in range(n)]
+        following = [[-1] * n for _ in range(n)]
+        for i in range(n):
+            seconds[i][i] = 0.0
+            following[i][i] = i
+        for a, b, cost in edges:
+            i, j = self.index[a], self.index[b]
+            if cost < seconds[i][j]:
+                seconds[i][j] = seconds[j][i] = cost
+                following[i][j] = j
+                following[j][i] = i
+        for k in range(n):
+            through = seconds[k]
+            for i in range(n):
+                to_k = seconds[i][k]
+                if to_k == inf:
+                    continue
+                row = seconds[i]
+                for j in range(n):
+                    if to_k + through[j] < row[j]:
+                        row[j] = to_k + through[j]
+                        following[i][j] = following[i][k]
+        self.seconds = seconds
+
+        self.paths = [[() for _ in range(n)] for _ in range(n)]
+        for i in range(n):
+            for j in range(n):
+                if seconds[i][j] == inf:
+                    continue
+                path = [i]
+                while path[-1] != j:
+                    path.append(following[path[-1]][j])
+                self.paths[i][j] = tuple(self.locations[k] for k in path)
+
+    def eta(self, start: str, end: str) -> float | None:
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None or self.seconds[i][j] == inf:
+            return None
+        return self.seconds[i][j]
+
+    def path(self, start: str, end: str) -> list[str]:
+        if start == end:
+            return [start]
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None:
+            return []
+        return list(self.paths[i][j])
+
+    def could_reach(
+        self, sightings: dict[str, tuple[str, float]], target: str, by_time: float
+    ) -> list[str]:
+        """
+        Players whose last sighting (location, time) leaves them enough time
+        to walk to `target` by `by_time`.
+        """
+        return sorted(
+            player
+            for player, (location, time) in sightings.items()
+            if (eta := self.eta(location, target)) is not None
+            and time + eta <= by_time
+        )
+
+
+def load_travel_table(path: Path = TRAVEL_TIMES, vents: bool = False) -> TravelTable:
+    graph = loads(path.read_bytes())
+    speed = graph["speed"]
+    edges = [(a, b, length / speed) for a, b, length in graph["edges"]]
+    if vents:
+        # Venting snaps the agent to the other vent straight away.
+        edges += [(a, b, 0.0) for group in VENTS for a in group for b in group if a != b]
+    return TravelTable(edges)
+
+
+TRAVEL = load_travel_table()
+VENT_TRAVEL = load_travel_table(vents=True)  # routes open to imposters
+
+
+class VentIndex:
+    """
+    Vent reachability built once from VENTS.
+
+    A location in several vent groups (Reactor, Navigation) can jump to the
+    vents of all of them; `reachable` follows chains of jumps for planning.
+    """
+
+    neighbours: dict[str, tuple[str, ...]]  # one jump away
+    reachable: dict[str, dict[str, int]]  # vent -> jumps needed, for every chain
+    nearest: dict[str, tuple[str, float]]  # location -> (vent, walking seconds)
+
+    def __init__(self, groups: list[set[str]], travel: TravelTable):
+        linked: dict[str, set[str]] = {}
+        for group in groups:
+            for vent in group:
+                linked.setdefault(vent, set()).update(group - {vent})
+        self.neighbours = {vent: tuple(sorted(others)) for vent, others in linked.items()}
+
+        self.reachable = {}
+        for start in sorted(linked):
+            jumps = {start: 0}
+            frontier = [start]
+            while frontier:
+                following = []
+                for vent in frontier:
+                    for other in self.neighbours[vent]:
+                        if other not in jumps:
+                            jumps[other] = jumps[vent] + 1
+                            following.append(other)
+                frontier = following
+            del jumps[start]
+            self.reachable[start] = jumps
+
+        self.nearest = {}
+        for location in travel.locations:
+            timed = [
+                (eta, vent)
+                for vent in sorted(linked)
+                if (eta := travel.eta(location, vent)) is not None
+            ]
+            if timed:
+                eta, vent = min(timed)
+                self.nearest[location] = (vent, eta)
+
+    def destinations(self, location: str) -> tuple[str, ...]:
+        return self.neighbours.get(location, ())
+
+    def closest(self, location: str) -> tuple[str, float] | None:
+        return self.nearest.get(location)
+
+
+VENT_INDEX = VentIndex(VENTS, TRAVEL)
@@ -0,0 +1,235 @@
+import asyncio
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from agent.codec import loads
+from agent.constants import Event
+from agent.history import GameLog
+
+if TYPE_CHECKING:  # agent.prompts reads MeetingConfig, and agent.agent imports it
+    from agent.agent import Agent
+
+SKIP = "skip"
+
+
+class MeetingConfig:
+    CHAT_ROUNDS = 3
+    # Send each chat message to Unity as ChatDelta frames while it is being
+    # generated, then the full text as a Chat frame.
+    STREAM_CHAT = True
+    # Build the next speaker's prompt context while the current one speaks.
+    PREFETCH_CHAT = True
+    # Also send that context alone (one output token) so the provider's
+    # prefix cache holds it by the speaker's turn. Costs a request per turn.
+    WARM_PREFIX_CACHE = False
+    # Seconds every alive player gets to vote, all at once; ballots still
+    # missing after that count as skips.
+    VOTE_DEADLINE: float | None = 20.0
+
+
+class Ballot:
+    __slots__ = ("voter", "target", "missed")
+
+    voter: str
+    target: str  # a player or SKIP
+    missed: bool  # no usable vote arrived, counted as a skip
+
+    def __init__(self, voter: str, target: str = SKIP, missed: bool = False):
+        self.voter = voter
+        self.target = target
+        self.missed = missed
+
+    @classmethod
+    def parse(cls, voter: str, arguments: str | None, candidates: list[str]) -> "Ballot":
+        """A ballot from the vote() tool arguments, e.g. '{"vote": "Red"}'."""
+        try:
+            target = loads(arguments or "")["vote"]
+        except (ValueError, TypeError, KeyError):
+            return cls(voter, missed=True)
+        if target == SKIP or target in candidates:
+            return cls(voter, target)
+        return cls(voter, missed=True)  # a dead or unknown player
+
+
+class Tally:
+    """
+    Votes per target and the outcome, under the usual rules: the most voted
+    player is ejected unless skip has as many votes or more, and any tie for
+    the most votes ejects nobody.
+    """
+
+    counts: dict[str, int]
+    ejected: str | None
+
+    def __init__(self, ballots: list[Ballot]):
+        self.counts = {}
+        for ballot in ballots:
+            self.counts[ballot.target] = self.counts.get(ballot.target, 0) + 1
+        skips = self.counts.get(SKIP, 0)
+        players = sorted(
+            (count, target) for target, count in self.counts.items() if target != SKIP
+        )
+        self.ejected = None
+        if players:
+            top, leader = players[-1]
+            runner_up = players[-2][0] if len(players) > 1 else 0
+            if top > skips and top > runner_up:
+                self.ejected = leader
+
+    @property
+    def result(self) -> str:
+        return self.ejected or SKIP
+
+
+class Meeting:
+    """
+    One emergency meeting or body report: the chat rounds, then every alive
+    player's vote, collected concurrently under a deadline.
+    """
+
+    event: Event
+    caller: str
+    alive_players: list[str]
+    ballots: list[Ballot]
+
+    def __init__(
+        self,
+        event: Event,
+        agents: dict[str, "Agent"],
+        log: GameLog,
+        send: Callable[[dict], Awaitable[None]],
+        config=MeetingConfig,
+    ):
+        self.event = event
+        self.agents = agents
+        self.log = log
+        self.send = send
+        self.config = config
+        details: dict = event.data  # type: ignore
+        self.caller = details["caller"]
+        self.alive_players = details["alivePlayers"]
+        self.ballots = []
+
+    async def run(self) -> Tally:
+        await self.discuss()
+        self.ballots = await self.collect_votes()
+        for ballot in self.ballots:
+            self.log.broadcast(
+                Event(
+                    type="vote",
+                    details=f"{ballot.voter} voted {ballot.target}",
+                    time=self.event.time,
+                )
+            )
+        tally = Tally(self.ballots)
+        await self.send(
+            {
+                "type": "Vote",
+                "details": tally.result,
+                "time": self.event.time,
+                "agent": "Red",  # Ignore
+            }
+        )
+        return tally
+
+    async def discuss(self):
+        chat_order = [self.caller] + [p for p in self.alive_players if p != self.caller]
+        turns = [
+            (round, player)
+            for round in range(1, self.config.CHAT_ROUNDS + 1)
+            for player in chat_order
+        ]
+        for agent in self.agents.values():
+            agent.chat_draft = None  # never carried over from another meeting
+        prefetches: list[asyncio.Task] = []
+        try:
+            for i, (round, player) in enumerate(turns):
+                if self.config.PREFETCH_CHAT and i + 1 < len(turns):
+                    # Starts once this turn's prompt is built and sent.
+                    prefetches.append(asyncio.create_task(self.prefetch(turns[i + 1][1])))
+                try:
+                    message = await self.speak(player, round)
+                except Exception as e:
+                    print(f"{player} could not speak in round {round}: {e}")
+                    continue  # the meeting still goes on to the vote
+                await self.send(
+                    {
+                        "type": "Chat",
+                        "details": message,
+                        "time": self.event.time,
+                        "agent": player,
+                    }
+                )
+                self.log.broadcast(
+                    Event(
+                        type="chatMessage",
+                        details=f"{player}: {message}",
+                        time=self.event.time,
+                    )
+                )
+        finally:
+            for task in prefetches:
+                task.cancel()  # only cache warm-ups can still be running
+
+    async def prefetch(self, player: str):
+        agent = self.agents[player]
+        agent.prepare_chat()
+        if self.config.WARM_PREFIX_CACHE:
+            try:
+                await agent.warm_chat()
+            except Exception as e:
+                print(f"Could not warm {player}'s chat prompt: {e}")
+
+    async def speak(self, player: str, round: int) -> str:
+        agent = self.agents[player]
+        body_found = self.event.type == "bodyFound"
+        was_reporter = player == self.caller
+        if not self.config.STREAM_CHAT:
+            return await agent.on_request_chat(body_found, round, was_reporter)
+
+        deltas = []
+        try:
+            async for delta in agent.stream_chat(body_found, round, was_reporter):
+                deltas.append(delta)
+                await self.send(
+                    {
+                        "type": "ChatDelta",
+                        "details": delta,
+                        "time": self.event.time,
+                        "agent": player,
+                    }
+                )
+        except Exception as e:
+            if deltas:
+                # Unity already shows these deltas, so they become the message.
+                print(f"{player}'s chat stream broke off, keeping what was sent: {e}")
+                return "".join(deltas)
+            print(f"{player}'s chat stream failed, asking again without streaming: {e}")
+            return await agent.on_request_chat(body_found, round, was_reporter)
+        return "".join(deltas)
+
+    async def collect_votes(self) -> list[Ballot]:
+        """Every alive player's ballot, in alive-player order."""
+        voters = [player for player in self.alive_players if player in self.agents]
+        tasks = {
+            voter: asyncio.create_task(self.agents[voter].on_vote(self.alive_players))
+            for voter in voters
+        }
+        done = set()
+        try:
+            if tasks:
+                done, _ = await asyncio.wait(tasks.values(), timeout=self.config.VOTE_DEADLINE)
+        finally:
+            for task in tasks.values():
+                task.cancel()  # no-op for the finished ones
+
+        ballots = []
+        for voter, task in tasks.items():
+            if task not in done or task.cancelled():
+                print(f"{voter} did not vote before the deadline")
+                ballots.append(Ballot(voter, missed=True))
+            elif task.exception() is not None:
+                print(f"{voter} could not vote: {task.exception()}")
+                ballots.append(Ballot(voter, missed=True))
+            else:
+                ballots.append(Ballot.parse(voter, task.result(), self.alive_players))
+        return ballots
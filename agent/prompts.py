@@ -0,0 +1,211 @@
+from functools import lru_cache
+from typing import Literal
+
+from agent.compaction import estimate_tokens
+from agent.constants import Role
+from agent.meeting import MeetingConfig
+
+CallType = Literal["decision", "chat", "vote"]
+
+# Everything that is the same on every call of a type lives in the system
+# message, right after the agent's system prompt, so the provider's prefix
+# cache covers it. The user message holds only what changes per call.
+
+DECISION_INSTRUCTIONS = """Each turn you are shown the game history, the current time, your state, your current action and your thoughts.
+What would you like to do?
+You can either:
+1. Update your thoughts using the think() function. Your future events will see this new thought. You should do this at max once. You should format your thought as:
+"Current Priority: <what your current priority is, e.g. 'gathering information', 'completing tasks', 'sabotaging', etc.>
+Reasoning: <your reasoning for this priority>
+Next Steps: <what your next steps are to accomplish this priority>
+Additional Notes: <any additional notes you have>"
+2. Use getFastestPath() or findClosestVent() to get information about the map to help you make a decision.
+3. Take an action using the allowed actions. Taking an action ends your turn.
+4. If you have a current action, continue it using the continue_current_action() function. This ends your turn. You should do this if the nothing too important happened.
+{tool_rule}
+Unless something really unexpected happens, you should probably continue your current action.
+Remember: Only imposters can kill and vent.
+Note: Do not move to the room you are currently in.
+Note: No matter what, you must send a tool call. If you don't want to do anything, you can call continue_current_action() to continue doing nothing. If you want to think, use the think() function."""
+
+TOOL_RULES = {
+    "think_first": "You can only call one tool at a time.",
+    "single_call": "Call think() and then one other tool in the same response; both calls are handled in order.",
+}
+
+CHAT_INSTRUCTIONS = """During a meeting you are shown the game history, your state before the meeting and your thoughts, then what has been said since and asked to speak.
+Just respond with what you would say, no filler text. Be concise. You should probably share any information you have, such as where you were, who you saw, and any suspicions you have. Limit your response to at most 3 sentences.
+There are {rounds} total rounds of questioning."""
+
+VOTE_INSTRUCTIONS = """At the end of a meeting you are shown the game history, your state before the meeting and your thoughts, and asked to vote.
+You can either vote to eject a player or skip the vote."""
+
+ROLE_NOTES: dict[CallType, dict[Role, str]] = {
+    "decision": {
+        "imposter": "\n\nRemember, you are an imposter. If you see a free kill without many people around, you should take it. Additionally, you should be relatively aggressive in kills.",
+        "crewmate": "\n\nYou should report bodies as soon as you see them.",
+    },
+    "chat": {
+        "imposter": "\n\nRemember, you are an imposter.",
+        "crewmate": "\n\nIf you see someone vent, you should call an emergency meeting and share that information, since only imposters can vent.",
+    },
+    "vote": {
+        "imposter": "\n\nRemember, you are an imposter.",
+        "crewmate": "",
+    },
+}
+
+DECISION_TAIL = """Game History:
+{history}
+
+Current Time:
+{time}
+
+Current State:
+{state}
+
+Current Action:
+{action}
+
+Current Thoughts:
+{thoughts}{notes}
+
+What would you like to do?"""
+
+MEETING_TAIL = """Game History:
+{history}
+
+State Before Meeting:
+{state}
+
+Current Thoughts:
+{thoughts}{notes}
+
+{ask}"""
+
+# Chat keeps the meeting's context in its own message and puts only what was
+# said since and the question after it, so the context can be built (and the
+# provider's prefix cache warmed with it) before the speaker's turn.
+CHAT_CONTEXT_TAIL = """Game History:
+{history}
+
+State Before Meeting:
+{state}
+
+Current Thoughts:
+{thoughts}{notes}"""
+
+
+@lru_cache(maxsize=256)
+def system_message(system_prompt: str, instructions: str, role_note: str) -> str:
+    return system_prompt + "\n\n" + instructions + role_note
+
+
+class PromptTemplate:
+    call_type: CallType
+    instructions: str
+    tail: str
+
+    def __init__(self, call_type: CallType, instructions: str, tail: str):
+        self.call_type = call_type
+        self.instructions = instructions
+        self.tail = tail
+
+    def prefix(self, system_prompt: str, role: Role) -> str:
+        return system_message(
+            system_prompt, self.instructions, ROLE_NOTES[self.call_type][role]
+        )
+
+    def render(self, system_prompt: str, role: Role, **fields) -> list[dict]:
+        return [
+            {"role": "system", "content": self.prefix(system_prompt, role)},
+            {"role": "user", "content": self.tail.format(**fields)},
+        ]
+
+
+DECISION_TEMPLATES = {
+    mode: PromptTemplate(
+        "decision", DECISION_INSTRUCTIONS.format(tool_rule=rule), DECISION_TAIL
+    )
+    for mode, rule in TOOL_RULES.items()
+}
+CHAT_TEMPLATE = PromptTemplate(
+    "chat", CHAT_INSTRUCTIONS.format(rounds=MeetingConfig.CHAT_ROUNDS), CHAT_CONTEXT_TAIL
+)
+VOTE_TEMPLATE = PromptTemplate("vote", VOTE_INSTRUCTIONS, MEETING_TAIL)
+
+
+def chat_turn(said: list[str], ask: str) -> dict:
+    """The last message of a chat prompt: what was said since its context, and the ask."""
+    if not said:
+        return {"role": "user", "content": ask}
+    return {"role": "user", "content": "Said since:\n" + "\n".join(said) + "\n\n" + ask}
+
+
+def cached_tokens(usage) -> int:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) or 0
+
+
+class PromptTypeStats:
+    calls: int
+    chars: int
+    static_tokens: int  # estimated, the system message
+    estimated_tokens: int
+    prompt_tokens: int  # as reported by the provider
+    cached_tokens: int
+
+    def __init__(self):
+        self.calls = 0
+        self.chars = 0
+        self.static_tokens = 0
+        self.estimated_tokens = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def snapshot(self) -> dict:
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "avg_chars": self.chars / calls,
+            "avg_prompt_tokens": self.prompt_tokens / calls,
+            "static_share": self.static_tokens / (self.estimated_tokens or 1),
+            "prefix_hit": self.cached_tokens / (self.prompt_tokens or 1),
+        }
+
+
+class PromptStats:
+    """Rendered prompt size and provider prefix-cache hits, per call type."""
+
+    types: dict[CallType, PromptTypeStats]
+
+    def __init__(self):
+        self.types = {
+            "decision": PromptTypeStats(),
+            "chat": PromptTypeStats(),
+            "vote": PromptTypeStats(),
+        }
+
+    def record(self, call_type: CallType, messages: list[dict], usage) -> None:
+        stats = self.types[call_type]
+        contents = [str(message.get("content") or "") for message in messages]
+        estimated = sum(estimate_tokens(content) for content in contents)
+        stats.calls += 1
+        stats.chars += sum(len(content) for content in contents)
+        stats.static_tokens += estimate_tokens(contents[0])
+        stats.estimated_tokens += estimated
+        stats.prompt_tokens += getattr(usage, "prompt_tokens", None) or estimated
+        stats.cached_tokens += cached_tokens(usage)
+
+    def snapshot(self) -> dict:
+        return {name: stats.snapshot() for name, stats in self.types.items()}
+
+    def __str__(self):
+        return ", ".join(
+            f"{name} {s['calls']} calls, {s['avg_prompt_tokens']:.0f} tok, "
+            f"{s['static_share']:.0%} static, {s['prefix_hit']:.0%} cached"
+            for name, s in self.snapshot().items()
+        )
+
+
+prompt_stats = PromptStats()
@@ -0,0 +1,172 @@
+import asyncio
+from collections import deque
+from statistics import median
+from time import monotonic
+
+
+class RateLimitConfig:
+    # The account's provider quotas; None leaves that bucket out. Supervisor
+    # workers each take an equal share (RateController.split).
+    REQUESTS_PER_MINUTE: float | None = None
+    TOKENS_PER_MINUTE: float | None = None
+    BURST_SECONDS = 5.0  # bucket capacity, in seconds of quota
+    EXPECTED_COMPLETION_TOKENS = 150  # reserved for calls that set no limit
+    # AIMD concurrency window: +1 per window of calls that succeed in good
+    # time, x DECREASE_FACTOR on a 429. Off, the window stays at its maximum.
+    ADAPTIVE = True
+    INITIAL_WINDOW = 4
+    MIN_WINDOW = 1
+    DECREASE_FACTOR = 0.5
+    LATENCY_FACTOR = 2.0  # slower than this x the recent median latency: no growth
+    LATENCY_SAMPLES = 100
+    # After a 429 every new call waits this long (or the Retry-After) so the
+    # retries of one burst do not hit the quota again together.
+    PAUSE_SECONDS = 1.0
+
+
+class TokenBucket:
+    rate: float  # per second
+    capacity: float
+    level: float  # negative while paying back an underestimate
+    updated: float
+
+    def __init__(self, per_minute: float, burst_seconds: float, now: float):
+        self.rate = per_minute / 60
+        self.capacity = self.rate * burst_seconds
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, amount: float) -> float:
+        """Seconds until `amount` (at most a full bucket) can be taken."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        self.level -= amount
+
+    def give(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateController:
+    """
+    Client-side request and token budgets, and the gateway's concurrency
+    window.
+
+    Each call reserves one request and its estimated tokens before it is
+    sent. Providers count a call's completion limit when they admit it, so
+    the reservation is only returned for rejected calls, and a call that
+    used more than it reserved pays the difference.
+    The window grows additively while calls succeed without slowing down
+    and shrinks multiplicatively on 429s, at most once per usual latency so
+    one burst of 429s counts once.
+    """
+
+    window: float
+    max_window: int
+    throttles: int
+    paused_until: float
+
+    def __init__(self, max_window: int, config=RateLimitConfig):
+        self.config = config
+        self.max_window = max_window
+        self.window = float(
+            min(max_window, config.INITIAL_WINDOW) if config.ADAPTIVE else max_window
+        )
+        self.throttles = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latencies: deque[float] = deque(maxlen=config.LATENCY_SAMPLES)
+        self._requests: TokenBucket | None = None
+        self._tokens: TokenBucket | None = None
+        self._parts = 1
+
+    def _buckets(self, now: float) -> list[TokenBucket]:
+        if self._requests is None and self.config.REQUESTS_PER_MINUTE:
+            self._requests = TokenBucket(
+                self.config.REQUESTS_PER_MINUTE / self._parts, self.config.BURST_SECONDS, now
+            )
+        if self._tokens is None and self.config.TOKENS_PER_MINUTE:
+            self._tokens = TokenBucket(
+                self.config.TOKENS_PER_MINUTE / self._parts, self.config.BURST_SECONDS, now
+            )
+        buckets = [b for b in (self._requests, self._tokens) if b is not None]
+        for bucket in buckets:
+            bucket.refill(now)
+        return buckets
+
+    def split(self, parts: int):
+        """Keep to a 1/parts share of the quotas, for one of `parts` processes."""
+        self._parts = parts
+        self._requests = self._tokens = None
+
+    @property
+    def limit(self) -> int:
+        return max(self.config.MIN_WINDOW, int(self.window))
+
+    async def reserve(self, tokens: int) -> int:
+        """Wait until one request and `tokens` fit the budget, and take them."""
+        while True:
+            now = monotonic()
+            self._buckets(now)
+            delay = self.paused_until - now
+            if self._requests is not None:
+                delay = max(delay, self._requests.wait(1))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.wait(tokens))
+            if delay <= 0:
+                if self._requests is not None:
+                    self._requests.take(1)
+                if self._tokens is not None:
+                    self._tokens.take(tokens)
+                return tokens
+            await asyncio.sleep(delay)
+
+    def settle(self, reserved: int, used: int):
+        """`used` is the reported usage, 0 for a call that was rejected."""
+        if self._tokens is None:
+            return
+        if not used:
+            self._tokens.give(reserved)
+        elif used > reserved:
+            self._tokens.take(used - reserved)
+
+    def succeeded(self, latency: float):
+        if not self.config.ADAPTIVE:
+            self._latencies.append(latency)
+            return
+        usual = median(self._latencies) if self._latencies else latency
+        self._latencies.append(latency)
+        if latency <= usual * self.config.LATENCY_FACTOR:
+            self.window = min(self.max_window, self.window + 1 / self.window)
+
+    def throttled(self, retry_after: float | None):
+        now = monotonic()
+        self.throttles += 1
+        self.paused_until = max(
+            self.paused_until, now + (retry_after or self.config.PAUSE_SECONDS)
+        )
+        if not self.config.ADAPTIVE:
+            return
+        usual = median(self._latencies) if self._latencies else self.config.PAUSE_SECONDS
+        if now - self._last_decrease >= usual:
+            self._last_decrease = now
+            self.window = max(
+                self.config.MIN_WINDOW, self.window * self.config.DECREASE_FACTOR
+            )
+
+    def budget(self) -> dict:
+        """The current window and what is left in each bucket."""
+        now = monotonic()
+        self._buckets(now)
+        return {
+            "window": round(self.window, 2),
+            "requests": None if self._requests is None else int(self._requests.level),
+            "tokens": None if self._tokens is None else int(self._tokens.level),
+            "paused": max(0.0, self.paused_until - now),
+            "throttles": self.throttles,
+        }
@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import asynccontextmanager
+from heapq import heappop, heappush
+from itertools import count
+
+from agent.constants import AgentState, Event, Role
+
+
+class SchedulerConfig:
+    # Lower levels run first. Each level is worth LEVEL_SECONDS of queueing,
+    # so a routine call that has waited long enough still goes ahead of
+    # newer urgent ones.
+    LEVEL_SECONDS = 2.0
+    EVENT_LEVELS = {
+        "killRange": 0,
+        "seeBody": 0,
+        "seeKill": 0,
+        "seeEnterVent": 1,
+        "seeExitVent": 1,
+        "sabotage": 1,
+        "completeKill": 1,
+        "seePlayer": 2,
+        "killCooldownEnd": 2,
+        "sabotageCooldownEnd": 2,
+        "security": 2,
+        "admin": 2,
+        "seePlayerEnd": 3,
+        "killRangeEnd": 3,
+        "sabotageEnd": 3,
+        "completeTask": 3,
+        "vent": 3,
+        "reachLocation": 4,
+    }
+    DEFAULT_LEVEL = 3
+    MEETING_LEVEL = 1  # meeting chat and votes
+    SPECULATIVE_LEVEL = 5  # prefix-cache warm-ups nobody waits on
+    # Sabotages whose countdown loses the game; every crewmate call is urgent
+    # while one is active.
+    CRITICAL_SABOTAGES = {"Reactor", "Oxygen"}
+    CRITICAL_LEVEL = 0
+
+
+def urgency(
+    events: list[Event], state: AgentState | None, role: Role, config=SchedulerConfig
+) -> int:
+    """The scheduling level of a decision about `events`."""
+    level = min(
+        (
+            config.EVENT_LEVELS.get(event.type.split(":")[0], config.DEFAULT_LEVEL)
+            for event in events
+        ),
+        default=config.DEFAULT_LEVEL,
+    )
+    if (
+        role == "crewmate"
+        and state is not None
+        and any(state.sabotage.get(name) for name in config.CRITICAL_SABOTAGES)
+    ):
+        level = min(level, config.CRITICAL_LEVEL)
+    return level
+
+
+class PriorityLimiter:
+    """
+    A semaphore that hands free slots to the most urgent waiter first, and
+    among equally urgent waiters to the one that has waited longest. Its
+    limit can be changed while in use (see resize).
+    """
+
+    limit: int
+    _free: int
+    _waiters: list[tuple[float, int, asyncio.Future]]  # heap of (key, arrival, future)
+
+    def __init__(self, limit: int, config=SchedulerConfig):
+        self.limit = limit
+        self.config = config
+        self._free = limit
+        self._waiters = []
+        self._arrivals = count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, level: int) -> None:
+        if self._free > 0 and not self.waiting:
+            self._free -= 1
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = loop.time() + level * self.config.LEVEL_SECONDS
+        heappush(self._waiters, (key, next(self._arrivals), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # handed a slot just as we were cancelled
+            raise
+
+    def release(self) -> None:
+        if self._free < 0:
+            self._free += 1  # one of the calls over a since-lowered limit
+        elif not self._hand_over():
+            self._free += 1
+
+    def resize(self, limit: int) -> None:
+        """Change the limit; calls already running over a lower one finish normally."""
+        self._free += limit - self.limit
+        self.limit = limit
+        while self._free > 0 and self._hand_over():
+            self._free -= 1
+
+    def _hand_over(self) -> bool:
+        while self._waiters:
+            _, _, future = heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    @asynccontextmanager
+    async def slot(self, level: int):
+        await self.acquire(level)
+        try:
+            yield
+        finally:
+            self.release()
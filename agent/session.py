@@ -0,0 +1,108 @@
+import asyncio
+from asyncio import StreamReader, StreamWriter
+from itertools import count
+from random import Random
+from typing import Callable, Iterator
+
+from agent.constants import PLAYERS
+from agent.data import DataConfig, DataHandler
+from agent.gateway import get_gateway
+from agent.prompts import prompt_stats
+
+
+def random_imposters(seed: int | None = None, imposters: int = 1) -> Callable[[int], list[str]]:
+    """Role assignment for stand-in clients, which do not fix roles in a scene."""
+    rng = Random(seed)
+    return lambda session_id: rng.sample(PLAYERS, imposters)
+
+
+class SessionManager:
+    """
+    Accepts any number of game connections on one port.
+
+    Each connection gets its own DataHandler, so agents, roles and histories
+    are per game; all games share this process's event loop and LLM client.
+    """
+
+    sessions: dict[int, DataHandler]
+
+    def __init__(
+        self,
+        config=DataConfig,
+        assign_roles: Callable[[int], list[str]] | None = None,
+        session_ids: Iterator[int] | None = None,
+    ):
+        self.config = config
+        self.assign_roles = assign_roles or (lambda session_id: config.IMPOSTERS)
+        self.sessions = {}
+        self.completed = 0
+        self.server: asyncio.Server = None  # type: ignore
+        self._ids = session_ids or count(1)
+        self._closed_batches = 0
+        self._closed_events = 0
+        self._closed_overruns = 0
+        self._closed_missed_votes = 0
+        self._closed_decisions = 0
+        self._closed_round_trips = 0
+        self._closed_step_overruns = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self.on_connect,
+            self.config.HOST,
+            self.config.PORT,
+            reuse_address=True,
+        )
+        print(f"listening for connections on {self.config.HOST}:{self.config.PORT}")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def on_connect(self, reader: StreamReader, writer: StreamWriter):
+        session_id = next(self._ids)
+        handler = DataHandler(self.config, session_id=session_id)
+        handler.initialize_agents(self.assign_roles(session_id))
+        handler.attach(reader, writer)
+        self.sessions[session_id] = handler
+        try:
+            await handler.main_loop()
+        except Exception as e:
+            print(f"[session {session_id}] ended with error: {e!r}")
+            writer.close()
+        finally:
+            del self.sessions[session_id]
+            self.completed += 1
+            self._closed_batches += handler.decode_stats.batches
+            self._closed_events += handler.decode_stats.events
+            self._closed_overruns += handler.budget_overruns
+            self._closed_missed_votes += handler.missed_votes
+            for agent in handler.agents.values():
+                self._closed_decisions += agent.decisions
+                self._closed_round_trips += agent.round_trips
+                self._closed_step_overruns += agent.step_overruns
+            print(f"[session {session_id}] closed, {len(self.sessions)} active")
+
+    def stats(self) -> dict:
+        handlers = self.sessions.values()
+        agents = [agent for h in handlers for agent in h.agents.values()]
+        return {
+            "active": len(self.sessions),
+            "completed": self.completed,
+            "batches": self._closed_batches
+            + sum(h.decode_stats.batches for h in handlers),
+            "events": self._closed_events + sum(h.decode_stats.events for h in handlers),
+            "overruns": self._closed_overruns
+            + sum(h.budget_overruns for h in handlers),
+            "step_overruns": self._closed_step_overruns
+            + sum(a.step_overruns for a in agents),
+            "missed_votes": self._closed_missed_votes
+            + sum(h.missed_votes for h in handlers),
+            "decisions": self._closed_decisions + sum(a.decisions for a in agents),
+            "round_trips": self._closed_round_trips
+            + sum(a.round_trips for a in agents),
+            "llm": get_gateway().snapshot(),
+            "prompts": prompt_stats.snapshot(),
+        }
@@ -0,0 +1,254 @@
+import asyncio
+import socket
+import threading
+from itertools import count
+from multiprocessing import Pipe, Process, Queue
+from multiprocessing.connection import Connection
+from queue import Empty
+from time import monotonic
+
+from agent.data import DataConfig
+from agent.gateway import get_gateway
+from agent.session import SessionManager, random_imposters
+
+
+class SupervisorConfig:
+    WORKERS = 4
+    STATS_INTERVAL = 5.0  # seconds between worker reports
+    REPORT_INTERVAL = 30.0  # seconds between supervisor summaries
+
+
+def worker_main(
+    worker_id: int,
+    workers: int,
+    sockets: Connection,
+    stats: Queue,
+    config=DataConfig,
+    stats_interval: float = SupervisorConfig.STATS_INTERVAL,
+    role_seed: int | None = None,
+):
+    asyncio.run(
+        _worker(worker_id, workers, sockets, stats, config, stats_interval, role_seed)
+    )
+
+
+async def _worker(
+    worker_id: int,
+    workers: int,
+    sockets: Connection,
+    stats: Queue,
+    config,
+    stats_interval: float,
+    role_seed: int | None,
+):
+    loop = asyncio.get_running_loop()
+    get_gateway().rate.split(workers)  # the provider quotas cover every worker
+    manager = SessionManager(
+        config,
+        assign_roles=(
+            random_imposters(role_seed + worker_id) if role_seed is not None else None
+        ),
+        # interleaved so session ids stay unique across workers
+        session_ids=count(worker_id + 1, workers),
+    )
+    tasks: set[asyncio.Task] = set()
+    received = 0
+
+    def report():
+        stats.put(dict(manager.stats(), worker=worker_id, received=received))
+
+    async def serve(sock: socket.socket):
+        reader, writer = await asyncio.open_connection(sock=sock)
+        await manager.on_connect(reader, writer)
+        report()
+
+    def receive():
+        # Blocking pipe reads stay off the event loop.
+        while True:
+            try:
+                sock = sockets.recv()
+            except EOFError:
+                break
+            if sock is None:
+                break
+            loop.call_soon_threadsafe(start, sock)
+        loop.call_soon_threadsafe(stopped.set)
+
+    def start(sock: socket.socket):
+        nonlocal received
+        received += 1
+        task = asyncio.create_task(serve(sock))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    stopped = asyncio.Event()
+    threading.Thread(target=receive, daemon=True).start()
+    print(f"[worker {worker_id}] ready")
+    while not stopped.is_set():
+        report()
+        try:
+            await asyncio.wait_for(stopped.wait(), stats_interval)
+        except asyncio.TimeoutError:
+            pass
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    report()
+
+
+def round_trips_per_decision(stats: dict) -> float:
+    return stats["round_trips"] / stats["decisions"] if stats["decisions"] else 0.0
+
+
+class WorkerHandle:
+    worker_id: int
+    process: Process
+    sockets: Connection
+    dispatched: int
+    stats: dict
+
+    def __init__(self, worker_id: int, process: Process, sockets: Connection):
+        self.worker_id = worker_id
+        self.process = process
+        self.sockets = sockets
+        self.dispatched = 0
+        self.stats = {
+            "active": 0,
+            "completed": 0,
+            "batches": 0,
+            "events": 0,
+            "overruns": 0,
+            "step_overruns": 0,
+            "decisions": 0,
+            "round_trips": 0,
+            "received": 0,
+            "llm": {
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "p95": 0.0,
+                "budget": {"window": 0, "throttles": 0},
+            },
+        }
+
+    @property
+    def load(self) -> int:
+        # connections in flight to the worker count as sessions already
+        return self.stats["active"] + self.dispatched - self.stats["received"]
+
+
+class Supervisor:
+    """
+    Spreads game connections over worker processes, one SessionManager each.
+
+    The supervisor owns the listening socket and hands every accepted
+    connection to the least loaded worker; workers report their session
+    counts back over a queue.
+    """
+
+    workers: list[WorkerHandle]
+
+    def __init__(
+        self,
+        config=DataConfig,
+        workers: int = SupervisorConfig.WORKERS,
+        supervisor_config=SupervisorConfig,
+        role_seed: int | None = None,
+    ):
+        self.config = config
+        self.supervisor_config = supervisor_config
+        self.stats_queue: Queue = Queue()
+        self.workers = []
+        for worker_id in range(workers):
+            receiver, sender = Pipe(duplex=False)
+            process = Process(
+                target=worker_main,
+                args=(
+                    worker_id,
+                    workers,
+                    receiver,
+                    self.stats_queue,
+                    config,
+                    supervisor_config.STATS_INTERVAL,
+                    role_seed,
+                ),
+                daemon=True,
+            )
+            self.workers.append(WorkerHandle(worker_id, process, sender))
+
+    def start(self):
+        for worker in self.workers:
+            worker.process.start()
+
+    def stop(self, timeout: float = 5.0):
+        for worker in self.workers:
+            worker.sockets.send(None)
+        for worker in self.workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    def pick_worker(self) -> WorkerHandle:
+        return min(self.workers, key=lambda worker: (worker.load, worker.worker_id))
+
+    def dispatch(self, sock: socket.socket):
+        worker = self.pick_worker()
+        worker.sockets.send(sock)  # duplicates the descriptor into the worker
+        worker.dispatched += 1
+        sock.close()
+        return worker
+
+    def collect_stats(self):
+        while True:
+            try:
+                report = self.stats_queue.get_nowait()
+            except Empty:
+                return
+            self.workers[report.pop("worker")].stats = report
+
+    def summary(self) -> str:
+        return "\n".join(
+            f"  worker {w.worker_id}: {w.stats['active']} active, "
+            f"{w.stats['completed']} completed, {w.stats['batches']} batches, "
+            f"{w.stats['events']} events, {w.stats['overruns']} budget overruns, "
+            f"{w.stats['step_overruns']} step overruns, "
+            f"{round_trips_per_decision(w.stats):.2f} round trips/decision, "
+            f"{w.stats['llm']['calls']} LLM calls ({w.stats['llm']['errors']} errors, "
+            f"{w.stats['llm']['retries']} retries, p95 {w.stats['llm']['p95']:.2f}s, "
+            f"window {w.stats['llm']['budget']['window']}, "
+            f"{w.stats['llm']['budget']['throttles']} throttled)"
+            for w in self.workers
+        )
+
+    async def serve_forever(self):
+        self.start()
+        loop = asyncio.get_running_loop()
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.config.HOST, self.config.PORT))
+        listener.listen()
+        listener.setblocking(False)
+        print(
+            f"supervising {len(self.workers)} workers on "
+            f"{self.config.HOST}:{self.config.PORT}"
+        )
+
+        last_report = monotonic()
+        try:
+            while True:
+                try:
+                    sock, address = await asyncio.wait_for(
+                        loop.sock_accept(listener), self.supervisor_config.STATS_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    sock = None
+                self.collect_stats()
+                if sock is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    worker = self.dispatch(sock)
+                    print(f"accepted connection from {address} -> worker {worker.worker_id}")
+                if monotonic() - last_report >= self.supervisor_config.REPORT_INTERVAL:
+                    print(f"worker stats:\n{self.summary()}")
+                    last_report = monotonic()
+        finally:
+            listener.close()
+            self.stop()
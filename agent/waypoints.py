@@ -0,0 +1,127 @@
+"""
+Offline export of waypoint travel distances from the Unity scene.
+
+Reads the Waypoint components of SampleScene.unity (positions and neighbour
+links) and writes the weighted location graph used by agent.mapindex:
+
+    python -m agent.waypoints [scene] [output]
+
+Rerun it whenever waypoints are moved or relinked in the editor.
+"""
+
+import json
+import re
+import sys
+from math import dist
+from pathlib import Path
+
+from agent.constants import HALLWAYS, ROOMS
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENE = ROOT / "environment" / "Assets" / "Scenes" / "SampleScene.unity"
+SCRIPTS = ROOT / "environment" / "Assets" / "Scripts"
+TRAVEL_TIMES = Path(__file__).resolve().parent / "travel_times.json"
+
+HEADER = re.compile(r"^--- !u!(\d+) &(\d+)", re.M)
+FILE_ID = re.compile(r"\{fileID: (\d+)")
+VECTOR = re.compile(r"\{x: ([-\d.eE]+), y: ([-\d.eE]+)")
+
+
+def script_guid(name: str) -> str:
+    meta = (SCRIPTS / f"{name}.cs.meta").read_text()
+    return re.search(r"guid: (\w+)", meta).group(1)  # type: ignore
+
+
+def parse_scene(text: str) -> dict[str, dict]:
+    """Each document's top-level fields, as raw strings, keyed by file id."""
+    headers = list(HEADER.finditer(text))
+    documents = {}
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        fields: dict = {"class": int(header.group(1))}
+        key = None
+        for line in text[header.end() : end].splitlines()[2:]:
+            if line.startswith("  - ") and key is not None:
+                fields[key].append(line[4:])
+            elif line.startswith("  ") and not line.startswith("   "):
+                key, _, value = line[2:].partition(":")
+                value = value.strip()
+                fields[key] = value if value and value != "[]" else []
+        documents[header.group(2)] = fields
+    return documents
+
+
+def file_id(value: str) -> str:
+    return FILE_ID.search(value).group(1)  # type: ignore
+
+
+def world_position(documents: dict, transform: str) -> tuple[float, float]:
+    # Waypoints only sit under unrotated parents, so scale and offset suffice.
+    x = y = 0.0
+    scale_x = scale_y = 1.0
+    chain = []
+    while transform != "0":
+        chain.append(documents[transform])
+        transform = file_id(documents[transform]["m_Father"])
+    for node in reversed(chain):
+        lx, ly = map(float, VECTOR.search(node["m_LocalPosition"]).groups())  # type: ignore
+        x += lx * scale_x
+        y += ly * scale_y
+        sx, sy = map(float, VECTOR.search(node["m_LocalScale"]).groups())  # type: ignore
+        scale_x *= sx
+        scale_y *= sy
+    return x, y
+
+
+def export(scene: Path = SCENE) -> dict:
+    documents = parse_scene(scene.read_text(encoding="utf-8-sig"))
+    waypoint_guid = script_guid("Waypoint")
+    follower_guid = script_guid("AgentPathFollower")
+
+    known = set(ROOMS + HALLWAYS)
+    names: dict[str, str] = {}  # waypoint component -> location
+    positions: dict[str, tuple[float, float]] = {}
+    links: dict[str, list[str]] = {}
+    speeds = set()
+    for component, fields in documents.items():
+        script = fields.get("m_Script", "")
+        if follower_guid in script:
+            speeds.add(float(fields["speed"]))
+        if waypoint_guid not in script:
+            continue
+        game_object = documents[file_id(fields["m_GameObject"])]
+        if game_object["m_Name"] not in known:
+            continue  # e.g. the DEAD holding point
+        names[component] = game_object["m_Name"]
+        transform = next(
+            file_id(entry)
+            for entry in game_object["m_Component"]
+            if documents[file_id(entry)]["class"] == 4
+        )
+        positions[component] = world_position(documents, transform)
+        links[component] = [file_id(entry) for entry in fields.get("neighbors") or []]
+
+    edges = {}
+    for component, neighbours in links.items():
+        for neighbour in neighbours:
+            if neighbour not in names:
+                continue
+            a, b = sorted((names[component], names[neighbour]))
+            edges[a, b] = round(dist(positions[component], positions[neighbour]), 3)
+
+    if len(speeds) != 1:
+        raise ValueError(f"expected one agent speed in the scene, found {sorted(speeds)}")
+    return {
+        "source": str(scene.relative_to(ROOT)) if scene.is_relative_to(ROOT) else str(scene),
+        "speed": speeds.pop(),  # scene units per second at timeScale 1
+        "locations": sorted(names.values()),
+        "edges": [[a, b, length] for (a, b), length in sorted(edges.items())],
+    }
+
+
+if __name__ == "__main__":
+    scene = Path(sys.argv[1]) if len(sys.argv) > 1 else SCENE
+    output = Path(sys.argv[2]) if len(sys.argv) > 2 else TRAVEL_TIMES
+    graph = export(scene)
+    output.write_text(json.dumps(graph, indent=1) + "\n")
+    print(f"wrote {len(graph['locations'])} locations, {len(graph['edges'])} edges to {output}")
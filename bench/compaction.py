@@ -0,0 +1,52 @@
+"""
+Meeting-prompt history size as the game gets longer.
+
+Compares the full history on_vote used to send with Compactor.view(), in
+estimated tokens and time to build.
+
+    python -m bench.compaction
+"""
+
+from random import Random
+from time import perf_counter
+
+from agent.compaction import Compactor, estimate_tokens
+from agent.constants import PLAYERS, ROOMS, Action, Event
+from agent.history import HistoryStore
+
+KINDS = ["seePlayer", "seePlayerEnd", "reachLocation", "completeTask", "seeBody", "vote"]
+
+
+def entry(rng: Random, time: float) -> Event | Action:
+    if rng.random() < 0.2:
+        return Action(type="Move", details=rng.choice(ROOMS), time=time)
+    kind = rng.choice(KINDS)
+    player = rng.choice(PLAYERS)
+    if kind == "reachLocation":
+        return Event(type=kind, details=f"you have reached {rng.choice(ROOMS)}", time=time)
+    if kind == "vote":
+        return Event(type=kind, details=f"{player} voted skip", time=time)
+    return Event(type=f"{kind}:{player}", details=f"you are near {player}", time=time)
+
+
+def main():
+    rng = Random(0)
+    store = HistoryStore()
+    compactor = Compactor()
+    time = 0.0
+    print(f"{'entries':>8} {'full tokens':>12} {'view tokens':>12} {'view build':>11}")
+    for target in (100, 1_000, 5_000, 20_000):
+        while len(store) < target:
+            time += rng.uniform(0.0, 2.0)
+            store.add(entry(rng, time))
+        compactor.refresh(store)  # what the background task does between meetings
+        full = estimate_tokens("\n".join(str(x) for x in store.all()))
+        start = perf_counter()
+        lines = compactor.view(store)
+        elapsed = perf_counter() - start
+        view = estimate_tokens("\n".join(lines))
+        print(f"{target:>8} {full:>12} {view:>12} {elapsed * 1e3:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
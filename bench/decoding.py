@@ -0,0 +1,116 @@
+"""
+Parse + validation cost of Unity `events` frames.
+
+Compares the old dict-walking path in DataHandler.receive_events with
+agent.decoding on meeting/kill bursts where all six agents report at once.
+
+    python -m bench.decoding
+"""
+
+from json import dumps as json_dumps, loads as json_loads
+from random import Random
+from time import perf_counter
+
+from agent.codec import CODECS, use_codec
+from agent.constants import PLAYERS, AgentState, Event, Task
+from agent.decoding import DecodeStats, decode_events
+from agent.codec import loads
+
+
+def make_frame(events_per_agent: int, seed: int = 0) -> bytes:
+    rng = Random(seed)
+    state = {
+        "location": "Cafeteria",
+        "sabotage": {"O2": True},
+        "tasks": [
+            {"location": "Electrical", "type": "common", "status": "incomplete"},
+            {"location": "MedBay", "type": "long", "status": "complete"},
+            {"location": "Reactor", "type": "short"},
+        ],
+        "imposterInformation": {},
+        "availableActions": ["Move", "Report", "Task", "Security"],
+    }
+    entries = [
+        {
+            "agent": agent,
+            "event": {
+                "type": rng.choice(["seePlayer", "seePlayerEnd", "killRange", "seeBody"]),
+                "details": f"{agent} saw {rng.choice(PLAYERS)} in Cafeteria",
+                "time": round(rng.uniform(0, 300), 3),
+            },
+            "state": state,
+        }
+        for agent in PLAYERS
+        for _ in range(events_per_agent)
+    ]
+    return json_dumps({"type": "events", "events": entries}).encode("utf-8")
+
+
+def legacy(frame: bytes):
+    events = json_loads(frame)["events"]
+    events.sort(key=lambda e: e["event"]["time"])
+    events_by_agent = {agent: [] for agent in PLAYERS}
+    for event in events:
+        events_by_agent[event["agent"]].append(event)
+    agent_states = {agent: {} for agent in PLAYERS if events_by_agent[agent]}
+    for agent, agent_events in events_by_agent.items():
+        if agent_events:
+            agent_states[agent] = agent_events[-1]["state"]
+    return {
+        agent: (
+            [
+                Event(
+                    type=event["event"]["type"],
+                    details=event["event"]["details"],
+                    time=event["event"]["time"],
+                )
+                for event in events_by_agent[agent]
+            ],
+            AgentState(
+                location=agent_states[agent]["location"],
+                sabotage=agent_states[agent].get("sabotage", {}),
+                tasks=[
+                    Task(
+                        location=task["location"],
+                        type=task["type"],
+                        status=task.get("status"),
+                    )
+                    for task in agent_states[agent].get("tasks", [])
+                ],
+                imposterInformation=agent_states[agent].get("imposterInformation", {}),
+                availableActions=agent_states[agent].get("availableActions", []),
+            ),
+        )
+        for agent in agent_states.keys()
+    }
+
+
+def typed(frame: bytes, stats: DecodeStats):
+    start = perf_counter()
+    data = loads(memoryview(frame))
+    stats.parse_seconds += perf_counter() - start
+    return decode_events(data["events"], PLAYERS, stats)
+
+
+def timeit(fn, repeat: int, rounds: int = 5) -> float:
+    """Best per-call time over `rounds`; this machine's noise only ever adds time."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (perf_counter() - start) / repeat)
+    return best
+
+
+if __name__ == "__main__":
+    for events_per_agent in [1, 10, 100, 1000]:
+        frame = make_frame(events_per_agent)
+        repeat = max(4, 4_000 // events_per_agent)
+        print(f"{events_per_agent * len(PLAYERS)} events, {len(frame) / 1e3:.1f} kB")
+        print(f"  legacy        {timeit(lambda: legacy(frame), repeat) * 1e6:10.1f} us/batch")
+        for name in CODECS:
+            use_codec(name)
+            stats = DecodeStats()
+            elapsed = timeit(lambda: typed(frame, stats), repeat)
+            print(f"  typed/{name:<7} {elapsed * 1e6:10.1f} us/batch  ({stats})")
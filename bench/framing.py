@@ -0,0 +1,83 @@
+"""
+Stress benchmark for NDJSON framing.
+
+Feeds large multi-line payloads through the old str-concat/split loop and
+through NDJSONFramer, in read sizes that regularly cut multi-byte UTF-8
+characters in half.
+
+    python -m bench.framing
+"""
+
+from json import dumps
+from time import perf_counter
+
+from agent.framing import NDJSONFramer
+
+
+def make_payload(lines: int, line_size: int) -> bytes:
+    body = "Red saw Blue vent ✓ — " * (line_size // 24)
+    return "".join(
+        dumps({"type": "events", "i": i, "details": body}, ensure_ascii=False) + "\n"
+        for i in range(lines)
+    ).encode("utf-8")
+
+
+def chunks(payload: bytes, size: int):
+    for i in range(0, len(payload), size):
+        yield payload[i : i + size]
+
+
+def legacy_frames(payload: bytes, size: int) -> tuple[int, int]:
+    rx_buffer = ""
+    frames = errors = 0
+    for chunk in chunks(payload, size):
+        try:
+            rx_buffer += chunk.decode("utf-8")
+        except UnicodeDecodeError:
+            errors += 1
+            continue
+        while "\n" in rx_buffer:
+            line, rx_buffer = rx_buffer.split("\n", 1)
+            if line.strip():
+                frames += 1
+    return frames, errors
+
+
+def framer_frames(payload: bytes, size: int) -> tuple[int, int]:
+    framer = NDJSONFramer()
+    frames = errors = 0
+    for chunk in chunks(payload, size):
+        framer.feed(chunk)
+        for frame in framer.frames():
+            try:
+                str(frame, "utf-8")
+            except UnicodeDecodeError:
+                errors += 1
+            frames += 1
+    return frames, errors
+
+
+def run(name, fn, payload: bytes, size: int) -> None:
+    start = perf_counter()
+    frames, errors = fn(payload, size)
+    elapsed = perf_counter() - start
+    mb = len(payload) / 1e6
+    print(
+        f"  {name:<8} {frames:>7} frames  {errors:>5} decode errors  "
+        f"{elapsed * 1000:9.1f} ms  {mb / elapsed:8.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    for lines, line_size, read_size in [
+        (20_000, 200, 500_000),  # many small frames per read
+        (2_000, 4_000, 500_000),
+        (200, 200_000, 65_537),  # frames larger than a read
+    ]:
+        payload = make_payload(lines, line_size)
+        print(
+            f"{lines} lines x ~{line_size} B, {len(payload) / 1e6:.1f} MB, "
+            f"reads of {read_size} B"
+        )
+        run("legacy", legacy_frames, payload, read_size)
+        run("framer", framer_frames, payload, read_size)
@@ -0,0 +1,79 @@
+"""
+Per-decision history assembly as the game gets longer.
+
+Compares the old concat-sort-slice of chat, action and event lists with
+HistoryStore.last(50), at several game lengths, and checks both agree.
+Then times rendering that window into prompt lines: every line formatted
+afresh against the lines cached on each entry.
+
+    python -m bench.history
+"""
+
+from random import Random
+from time import perf_counter
+
+from agent.constants import Action, Event
+from agent.history import HistoryStore
+
+WINDOW = 50
+
+
+def build(entries: int, seed: int = 0):
+    rng = Random(seed)
+    chat, actions, events = [], [], []
+    store = HistoryStore()
+    time = 0.0
+    for i in range(entries):
+        time += rng.uniform(0.0, 2.0)
+        kind = rng.random()
+        if kind < 0.02:
+            details = f'{{"caller": "Red", "body": "Blue", "alivePlayers": ["Red", "Green"]}}'
+            entry = Event(type="bodyFound", details=details, time=time)
+            events.append(entry)
+        elif kind < 0.1:
+            entry = Event(type="chatMessage", details=f"Red: message {i}", time=time)
+            chat.append(entry)
+        elif kind < 0.3:
+            entry = Action(type="Move", details="Cafeteria", time=time)
+            actions.append(entry)
+        else:
+            entry = Event(type="seePlayer", details=f"Red saw Blue ({i})", time=time)
+            events.append(entry)
+        store.add(entry)
+    return chat, actions, events, store
+
+
+def legacy(chat, actions, events):
+    total = chat + actions + events
+    total.sort(key=lambda x: x.time)
+    return total[-WINDOW:]
+
+
+def timed(fn, repeat: int) -> float:
+    start = perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'entries':>8} {'concat+sort':>12} {'store':>10}")
+    for entries in (100, 1_000, 10_000, 50_000):
+        chat, actions, events, store = build(entries)
+        assert [id(x) for x in legacy(chat, actions, events)] == [
+            id(x) for x in store.last(WINDOW)
+        ]
+        repeat = max(10, 200_000 // entries)
+        old = timed(lambda: legacy(chat, actions, events), repeat)
+        new = timed(lambda: store.last(WINDOW), repeat)
+        print(f"{entries:>8} {old * 1e6:>10.0f}us {new * 1e6:>8.1f}us")
+
+    window = store.last(WINDOW)
+    assert [entry.render() for entry in window] == [str(entry) for entry in window]
+    old = timed(lambda: "\n".join(entry.render() for entry in window), 20_000)
+    new = timed(lambda: "\n".join(str(entry) for entry in window), 20_000)
+    print(f"\nrender {WINDOW} lines: {old * 1e6:.1f}us formatted, {new * 1e6:.1f}us cached")
+
+
+if __name__ == "__main__":
+    main()
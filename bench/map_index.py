@@ -0,0 +1,231 @@
+"""
+Map queries: the old per-call BFS against the same BFS precomputed into a
+hop-count table, and the runtime's travel-time tables (agent.mapindex).
+
+Also checks that both give paths of the same length and the same closest
+vent distance for every pair of locations.
+
+    python -m bench.map_index
+"""
+
+from time import perf_counter
+
+from agent.constants import ALL_VENTS, LOCATION_GRAPH, VENTS
+from agent.mapindex import TRAVEL, VENT_TRAVEL
+
+
+def legacy_fastest_path(start: str, end: str) -> list[str]:
+    visited = set()
+    queue = [[start]]
+    if start == end:
+        return [start]
+    while queue:
+        path = queue.pop(0)
+        current = path[-1]
+        if current in visited:
+            continue
+        visited.add(current)
+        for neighbor in LOCATION_GRAPH.get(current, set()):
+            if neighbor == end:
+                return path + [neighbor]
+            if neighbor not in visited:
+                queue.append(path + [neighbor])
+    return []
+
+
+def legacy_closest_vent(location: str) -> tuple[str, int]:
+    visited = set()
+    queue = [(location, 0)]
+    while queue:
+        current, distance = queue.pop(0)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current in ALL_VENTS:
+            return current, distance
+        for neighbor in LOCATION_GRAPH.get(current, set()):
+            if neighbor not in visited:
+                queue.append((neighbor, distance + 1))
+    return "", -1
+
+
+class RouteTable:
+    """
+    All-pairs shortest paths over an unweighted location graph.
+
+    Built once with a BFS from every location; neighbours are visited in
+    sorted order so ties always resolve to the same path. Every query is a
+    table lookup.
+    """
+
+    locations: list[str]
+    index: dict[str, int]
+    distance: list[list[int]]  # -1 when unreachable
+    next_hop: list[list[int]]  # -1 when unreachable or already there
+    paths: list[list[tuple[str, ...]]]
+    within: list[list[tuple[str, ...]]]  # [source][k]: locations at most k hops away
+    nearest_vent: dict[str, tuple[str, int]]
+
+    def __init__(self, graph: dict[str, set[str]]):
+        self.locations = sorted(graph)
+        self.index = {location: i for i, location in enumerate(self.locations)}
+        n = len(self.locations)
+        neighbours = [
+            sorted(self.index[other] for other in graph[location])
+            for location in self.locations
+        ]
+
+        self.distance = [[-1] * n for _ in range(n)]
+        self.next_hop = [[-1] * n for _ in range(n)]
+        parents = [[-1] * n for _ in range(n)]
+        for source in range(n):
+            distance = self.distance[source]
+            parent = parents[source]
+            distance[source] = 0
+            frontier = [source]
+            while frontier:
+                following = []
+                for current in frontier:
+                    for neighbour in neighbours[current]:
+                        if distance[neighbour] < 0:
+                            distance[neighbour] = distance[current] + 1
+                            parent[neighbour] = current
+                            following.append(neighbour)
+                frontier = following
+
+        self.paths = [[() for _ in range(n)] for _ in range(n)]
+        for source in range(n):
+            for target in range(n):
+                if self.distance[source][target] < 0:
+                    continue
+                path = [target]
+                while path[-1] != source:
+                    path.append(parents[source][path[-1]])
+                path.reverse()
+                self.paths[source][target] = tuple(self.locations[i] for i in path)
+                if len(path) > 1:
+                    self.next_hop[source][target] = path[1]
+
+        diameter = max(max(row) for row in self.distance) if n else 0
+        self.within = [
+            [
+                tuple(
+                    self.locations[target]
+                    for target in range(n)
+                    if 0 <= self.distance[source][target] <= k
+                )
+                for k in range(diameter + 1)
+            ]
+            for source in range(n)
+        ]
+
+        vents = [self.index[vent] for vent in sorted(ALL_VENTS) if vent in self.index]
+        self.nearest_vent = {}
+        for source, location in enumerate(self.locations):
+            reachable = [
+                (self.distance[source][vent], vent)
+                for vent in vents
+                if self.distance[source][vent] >= 0
+            ]
+            if reachable:
+                distance, vent = min(reachable)
+                self.nearest_vent[location] = (self.locations[vent], distance)
+
+    def path(self, start: str, end: str) -> list[str]:
+        if start == end:
+            return [start]
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None:
+            return []
+        return list(self.paths[i][j])
+
+    def hops(self, start: str, end: str) -> int | None:
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None or self.distance[i][j] < 0:
+            return None
+        return self.distance[i][j]
+
+    def step(self, start: str, end: str) -> str | None:
+        """The first location to walk to from `start` towards `end`."""
+        i = self.index.get(start)
+        j = self.index.get(end)
+        if i is None or j is None or self.next_hop[i][j] < 0:
+            return None
+        return self.locations[self.next_hop[i][j]]
+
+    def within_hops(self, start: str, k: int) -> tuple[str, ...]:
+        i = self.index.get(start)
+        if i is None or k < 0:
+            return ()
+        rings = self.within[i]
+        return rings[min(k, len(rings) - 1)]
+
+    def closest_vent(self, location: str) -> tuple[str, int] | None:
+        return self.nearest_vent.get(location)
+
+
+def with_vents(graph: dict[str, set[str]]) -> dict[str, set[str]]:
+    """`graph` plus an edge between every pair of vents in the same group."""
+    augmented = {location: set(neighbours) for location, neighbours in graph.items()}
+    for group in VENTS:
+        for vent in group:
+            augmented.setdefault(vent, set()).update(group - {vent})
+    return augmented
+
+
+def timed(fn, repeat: int) -> float:
+    start = perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (perf_counter() - start) / repeat
+
+
+def main():
+    walk = RouteTable(LOCATION_GRAPH)
+    vent_walk = RouteTable(with_vents(LOCATION_GRAPH))  # routes open to imposters
+    locations = sorted(LOCATION_GRAPH)
+    pairs = [(a, b) for a in locations for b in locations]
+    for a, b in pairs:
+        assert len(legacy_fastest_path(a, b)) == len(walk.path(a, b)), (a, b)
+    for a in locations:
+        assert legacy_closest_vent(a)[1] == walk.closest_vent(a)[1], a  # type: ignore
+
+    rows = [
+        (
+            "path, all pairs",
+            lambda: [legacy_fastest_path(a, b) for a, b in pairs],
+            lambda: [walk.path(a, b) for a, b in pairs],
+        ),
+        (
+            "distance, all pairs",
+            lambda: [len(legacy_fastest_path(a, b)) - 1 for a, b in pairs],
+            lambda: [walk.hops(a, b) for a, b in pairs],
+        ),
+        (
+            "closest vent, all",
+            lambda: [legacy_closest_vent(a) for a in locations],
+            lambda: [walk.closest_vent(a) for a in locations],
+        ),
+    ]
+    print(f"{'query':<22} {'bfs':>10} {'table':>10} {'speedup':>8}")
+    for name, old, new in rows:
+        old_t = timed(old, 50)
+        new_t = timed(new, 50)
+        print(f"{name:<22} {old_t * 1e3:>8.2f}ms {new_t * 1e3:>8.3f}ms {old_t / new_t:>7.0f}x")
+
+    walked = sum(walk.hops(a, b) or 0 for a, b in pairs)
+    vented = sum(vent_walk.hops(a, b) or 0 for a, b in pairs)
+    print(f"\nmean hops: walking {walked / len(pairs):.2f}, with vents {vented / len(pairs):.2f}")
+    walking = sum(TRAVEL.eta(a, b) or 0 for a, b in pairs)
+    venting = sum(VENT_TRAVEL.eta(a, b) or 0 for a, b in pairs)
+    print(
+        f"mean travel time: walking {walking / len(pairs):.2f}s, "
+        f"with vents {venting / len(pairs):.2f}s"
+    )
+    print(f"within 2 hops of Cafeteria: {', '.join(walk.within_hops('Cafeteria', 2))}")
+
+
+if __name__ == "__main__":
+    main()
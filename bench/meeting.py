@@ -0,0 +1,145 @@
+"""
+Meeting vote collection: every alive player's on_vote() awaited in turn and
+tallied with max(set(votes), key=votes.count), against Meeting.collect_votes()
+and Tally, with the mock backend's latency model.
+
+Then the chat rounds, whole or streamed, with and without the next speaker's
+context prefetched (and the prefix cache warmed with it): how long after a
+speaker's turn starts their first words reach Unity, how long building the
+prompt takes at that point, and how much of it the provider had cached.
+
+    python -m bench.meeting --meetings 5 --latency 0.3
+"""
+
+import asyncio
+import os
+from argparse import ArgumentParser
+from json import dumps
+from time import perf_counter
+
+os.environ["LLM_BACKEND"] = "mock"
+
+from agent.agent import Agent
+from agent.backends import MockConfig
+from agent.constants import PLAYERS, Event
+from agent.history import GameLog
+from agent.meeting import SKIP, Ballot, Meeting, MeetingConfig, Tally
+from agent.prompts import PromptTypeStats, prompt_stats
+
+CHAT_CONFIGS = [
+    # (name, STREAM_CHAT, PREFETCH_CHAT, WARM_PREFIX_CACHE)
+    ("whole", False, False, False),
+    ("streamed", True, False, False),
+    ("prefetched", True, True, False),
+    ("warmed", True, True, True),
+]
+
+
+class TimedAgent(Agent):
+    build_seconds = 0.0
+
+    def chat_messages(self, *args, **kwargs):
+        start = perf_counter()
+        messages = super().chat_messages(*args, **kwargs)
+        TimedAgent.build_seconds += perf_counter() - start
+        return messages
+
+TALLIES = [
+    # (targets, expected result)
+    (["Red", "Red", "Blue", SKIP], "Red"),
+    (["Red", "Blue"], SKIP),  # tie for the most votes
+    (["Red", SKIP], SKIP),  # tied with skip
+    ([SKIP, SKIP, "Red"], SKIP),
+    (["Blue", "Red", "Blue", "Red", "Green"], SKIP),
+    ([], SKIP),
+]
+
+
+async def no_send(payload: dict) -> None:
+    pass
+
+
+async def legacy_votes(agents: dict[str, Agent], alive: list[str]) -> str:
+    votes = []
+    for player in alive:
+        votes.append(await agents[player].on_vote())
+    return max(set(votes), key=votes.count)
+
+
+async def main(args):
+    for targets, expected in TALLIES:
+        result = Tally([Ballot(f"v{i}", t) for i, t in enumerate(targets)]).result
+        assert result == expected, (targets, result)
+    assert Ballot.parse("Red", '{"vote": "Blue"}', PLAYERS).target == "Blue"
+    assert Ballot.parse("Red", "not json", PLAYERS).missed
+
+    MockConfig.MEDIAN_LATENCY = args.latency
+    MockConfig.SEED = args.seed
+    log = GameLog()
+    agents = {player: TimedAgent("crewmate", player, log=log) for player in PLAYERS}
+    for player, agent in agents.items():
+        # enough history for the chat context to pass the cacheable minimum
+        agent.add_events(
+            [
+                Event(type="seePlayer", details=f"{player} saw {other} in Cafeteria", time=-i)
+                for i, other in zip(range(300, 0, -1), PLAYERS * 50)
+            ]
+        )
+    details = dumps({"caller": "Red", "body": "Blue", "alivePlayers": PLAYERS})
+    event = Event(type="bodyFound", details=details, time=0.0)
+
+    sequential = concurrent = 0.0
+    for _ in range(args.meetings):
+        start = perf_counter()
+        await legacy_votes(agents, PLAYERS)
+        sequential += perf_counter() - start
+
+        meeting = Meeting(event, agents, log, no_send)
+        start = perf_counter()
+        Tally(await meeting.collect_votes())
+        concurrent += perf_counter() - start
+
+    print(f"{args.meetings} meetings, {len(PLAYERS)} voters, median latency {args.latency}s")
+    print(f"  votes in turn      {sequential / args.meetings:.2f}s per meeting")
+    print(f"  votes concurrently {concurrent / args.meetings:.2f}s per meeting")
+
+    for name, stream, prefetch, warm in CHAT_CONFIGS:
+        config = type(
+            "Config",
+            (MeetingConfig,),
+            {"STREAM_CHAT": stream, "PREFETCH_CHAT": prefetch, "WARM_PREFIX_CACHE": warm},
+        )
+        prompt_stats.types["chat"] = PromptTypeStats()
+        TimedAgent.build_seconds = 0.0
+        first_words = []
+        turn_start = None
+
+        async def send(payload: dict) -> None:
+            nonlocal turn_start
+            now = perf_counter()
+            if turn_start is not None:
+                first_words.append(now - turn_start)
+                turn_start = None
+            if payload["type"] == "Chat":
+                turn_start = now  # the next speaker starts
+
+        start = perf_counter()
+        for _ in range(args.meetings):
+            turn_start = perf_counter()
+            await Meeting(event, agents, log, send, config).discuss()
+        elapsed = (perf_counter() - start) / args.meetings
+        first_words.sort()
+        chat = prompt_stats.types["chat"]
+        print(
+            f"  chat {name:<11} first words {first_words[len(first_words) // 2]:.2f}s (p50), "
+            f"prompt build {TimedAgent.build_seconds / chat.calls * 1e6:>5.0f}us/turn, "
+            f"{chat.snapshot()['prefix_hit']:>4.0%} cached, {elapsed:.2f}s per meeting"
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--meetings", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,181 @@
+"""
+Memory held by a match's histories: dict-backed records with per-agent vote
+copies (the old model), slotted, interned records shared between per-agent
+lists, and one game log with a per-agent view of offsets into it.
+
+Both sides parse the same frames; the old side builds records the way
+decode_events and handle_meeting used to.
+
+    python -m bench.memory --batches 2000
+"""
+
+import gc
+import tracemalloc
+from argparse import ArgumentParser
+from json import dumps, loads
+from random import Random
+
+from agent.constants import PLAYERS, ROOMS, Event
+from agent.decoding import decode_events
+from agent.history import GameLog, HistoryStore
+
+EVENT_TYPES = ["seePlayer", "seePlayerEnd", "reachLocation", "completeTask", "killRange"]
+
+
+class LegacyTask:
+    status = None
+
+    def __init__(self, location, type, status=None):
+        self.location = location
+        self.type = type
+        self.status = status
+
+
+class LegacyEvent:
+    def __init__(self, type, details, time):
+        self.type = type
+        self.details = details
+        self.time = time
+
+
+class LegacyState:
+    def __init__(self, location, sabotage, tasks, imposterInformation, availableActions):
+        self.location = location
+        self.sabotage = sabotage
+        self.tasks = tasks
+        self.imposterInformation = imposterInformation
+        self.availableActions = availableActions
+
+
+def frames(batches: int, seed: int) -> list[bytes]:
+    rng = Random(seed)
+    out = []
+    for i in range(batches):
+        out.append(
+            dumps(
+                [
+                    {
+                        "agent": agent,
+                        "event": {
+                            "type": f"{rng.choice(EVENT_TYPES)}:{rng.choice(PLAYERS)}",
+                            "details": f"{agent} is near {rng.choice(PLAYERS)}",
+                            "time": float(i),
+                        },
+                        "state": {
+                            "location": rng.choice(ROOMS),
+                            "tasks": [
+                                {
+                                    "location": rng.choice(ROOMS),
+                                    "type": "short",
+                                    "status": "incomplete",
+                                }
+                            ],
+                            "availableActions": ["Move", "Task", "Report"],
+                        },
+                    }
+                    for agent in rng.sample(PLAYERS, 4)
+                ]
+            ).encode()
+        )
+    return out
+
+
+def legacy_match(payloads: list[bytes], meeting_every: int) -> dict:
+    histories = {player: [] for player in PLAYERS}
+    states = {}
+    for i, payload in enumerate(payloads):
+        for entry in loads(payload):
+            raw = entry["event"]
+            histories[entry["agent"]].append(
+                LegacyEvent(raw["type"], raw["details"], float(raw["time"]))
+            )
+            state = entry["state"]
+            states[entry["agent"]] = LegacyState(
+                state["location"],
+                {},
+                [LegacyTask(t["location"], t["type"], t["status"]) for t in state["tasks"]],
+                {},
+                state["availableActions"],
+            )
+        if meeting_every and i % meeting_every == meeting_every - 1:
+            for speaker in PLAYERS * 3:
+                for history in histories.values():
+                    history.append(LegacyEvent("chatMessage", f"{speaker}: ok", float(i)))
+            for voter in PLAYERS:
+                for history in histories.values():
+                    history.append(LegacyEvent("vote", f"{voter} voted skip", float(i)))
+    return histories
+
+
+def shared_match(payloads: list[bytes], meeting_every: int) -> dict:
+    histories = {player: [] for player in PLAYERS}
+    for i, payload in enumerate(payloads):
+        batch = decode_events(loads(payload), PLAYERS)
+        for agent, agent_batch in batch.agents.items():
+            histories[agent] += agent_batch.events
+        if meeting_every and i % meeting_every == meeting_every - 1:
+            for speaker in PLAYERS * 3:
+                chat = Event(type="chatMessage", details=f"{speaker}: ok", time=float(i))
+                for history in histories.values():
+                    history.append(chat)
+            for voter in PLAYERS:
+                vote = Event(type="vote", details=f"{voter} voted skip", time=float(i))
+                for history in histories.values():
+                    history.append(vote)
+    return histories
+
+
+def log_match(payloads: list[bytes], meeting_every: int) -> dict:
+    log = GameLog()
+    histories = {player: HistoryStore(log) for player in PLAYERS}
+    for i, payload in enumerate(payloads):
+        batch = decode_events(loads(payload), PLAYERS)
+        for agent, agent_batch in batch.agents.items():
+            histories[agent].extend(agent_batch.events)
+        if meeting_every and i % meeting_every == meeting_every - 1:
+            for speaker in PLAYERS * 3:
+                log.broadcast(Event(type="chatMessage", details=f"{speaker}: ok", time=float(i)))
+            for voter in PLAYERS:
+                log.broadcast(Event(type="vote", details=f"{voter} voted skip", time=float(i)))
+    return histories
+
+
+def measure(match, payloads: list[bytes], meeting_every: int) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    histories = match(payloads, meeting_every)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    size = sum(stat.size for stat in stats)
+    blocks = sum(stat.count for stat in stats)
+    del histories
+    return size, blocks
+
+
+def main(args):
+    payloads = frames(args.batches, args.seed)
+    print(f"{args.batches} batches, a meeting every {args.meeting_every}")
+    results = {}
+    for name, match in (
+        ("dict + copies", legacy_match),
+        ("slots + shared", shared_match),
+        ("game log", log_match),
+    ):
+        size, blocks = measure(match, payloads, args.meeting_every)
+        results[name] = size
+        print(
+            f"  {name:<15} {size / 1024:>9.0f} kB held  "
+            f"{blocks / args.batches:>7.1f} live blocks/batch"
+        )
+    old = results["dict + copies"]
+    for name in ("slots + shared", "game log"):
+        print(f"  saved, {name:<15} {(1 - results[name] / old):>5.0%}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--batches", type=int, default=2000)
+    parser.add_argument("--meeting-every", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,160 @@
+"""
+Offline end-to-end benchmark: stand-in Unity clients -> SessionManager ->
+DataHandler -> Agent -> LLM gateway, with the mock backend's latency model.
+
+    python -m bench.pipeline --games 8 --batches 40 --latency 0.3
+    python -m bench.pipeline --decision-mode single_call
+"""
+
+import asyncio
+import os
+from argparse import ArgumentParser
+from json import dumps, loads
+from random import Random
+from time import perf_counter
+
+os.environ["LLM_BACKEND"] = "mock"
+
+from agent.backends import MockConfig
+from agent.constants import PLAYERS, ROOMS
+from agent.data import DataConfig
+from agent.gateway import get_gateway
+from agent.prompts import prompt_stats
+from agent.session import SessionManager
+
+EVENT_TYPES = ["seePlayer", "seePlayerEnd", "reachLocation", "completeTask", "killRange"]
+
+
+class BenchConfig(DataConfig):
+    PORT = 0  # any free port
+
+
+def state(rng: Random) -> dict:
+    return {
+        "location": rng.choice(ROOMS),
+        "sabotage": {},
+        "tasks": [{"location": rng.choice(ROOMS), "type": "short", "status": "incomplete"}],
+        "imposterInformation": {},
+        "availableActions": ["Move", "Task", "Report", "Security"],
+    }
+
+
+async def read_reply(reader: asyncio.StreamReader) -> int:
+    """Read frames until the batch is answered; returns how many arrived."""
+    frames = 0
+    while True:
+        frame = loads(await reader.readline())
+        frames += 1
+        if isinstance(frame, list) or frame.get("type") == "BatchComplete":
+            return frames
+
+
+async def send(writer: asyncio.StreamWriter, events: list[dict]) -> None:
+    writer.write((dumps({"type": "events", "events": events}) + "\n").encode())
+    await writer.drain()
+
+
+async def stand_in_game(
+    port: int, batches: int, meeting_every: int, seed: int, latencies: list[float]
+):
+    rng = Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await read_reply(reader)  # reply to the opening batch
+
+    time = 0.0
+    for i in range(batches):
+        time += rng.uniform(1.0, 5.0)
+        meeting = meeting_every and i % meeting_every == meeting_every - 1
+        if meeting:
+            details = dumps({"caller": "Red", "body": "Blue", "alivePlayers": PLAYERS})
+            events = [
+                {
+                    "agent": agent,
+                    "event": {"type": "bodyFound", "details": details, "time": time},
+                    "state": state(rng),
+                }
+                for agent in PLAYERS
+            ]
+        else:
+            events = [
+                {
+                    "agent": agent,
+                    "event": {
+                        "type": rng.choice(EVENT_TYPES),
+                        "details": f"{agent} saw {rng.choice(PLAYERS)}",
+                        "time": time,
+                    },
+                    "state": state(rng),
+                }
+                for agent in rng.sample(PLAYERS, rng.randint(1, len(PLAYERS)))
+            ]
+
+        start = perf_counter()
+        await send(writer, events)
+        await read_reply(reader)
+        latencies.append(perf_counter() - start)
+
+        if meeting:
+            await send(
+                writer,
+                [
+                    {
+                        "agent": agent,
+                        "event": {"type": "meetingEnd", "details": "the meeting has ended", "time": time},
+                        "state": state(rng),
+                    }
+                    for agent in PLAYERS
+                ],
+            )
+            await read_reply(reader)
+
+    writer.close()
+
+
+async def main(args):
+    MockConfig.MEDIAN_LATENCY = args.latency
+    MockConfig.SEED = args.seed
+    BenchConfig.DECISION_MODE = args.decision_mode
+    manager = SessionManager(BenchConfig)
+    await manager.start()
+    port = manager.server.sockets[0].getsockname()[1]
+
+    latencies: list[float] = []
+    start = perf_counter()
+    await asyncio.gather(
+        *[
+            stand_in_game(port, args.batches, args.meeting_every, args.seed + game, latencies)
+            for game in range(args.games)
+        ]
+    )
+    elapsed = perf_counter() - start
+    while manager.sessions:  # let the server side notice the disconnects
+        await asyncio.sleep(0.01)
+    manager.server.close()
+
+    latencies.sort()
+    print(f"\n{args.games} games x {args.batches} batches in {elapsed:.1f}s")
+    print(f"  batches/s      {len(latencies) / elapsed:.1f}")
+    print(f"  batch p50      {latencies[len(latencies) // 2]:.2f}s")
+    print(f"  batch p95      {latencies[int(len(latencies) * 0.95)]:.2f}s")
+    stats = manager.stats()
+    print(f"  llm            {get_gateway().stats}")
+    print(f"  prompts        {prompt_stats}")
+    print(
+        f"  round trips    {stats['round_trips'] / max(stats['decisions'], 1):.2f}"
+        f"/decision ({args.decision_mode})"
+    )
+    print(f"  sessions       {stats}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--games", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--meeting-every", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.8, help="median LLM latency (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--decision-mode", choices=["think_first", "single_call"], default="think_first"
+    )
+    asyncio.run(main(parser.parse_args()))
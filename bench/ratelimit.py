@@ -0,0 +1,100 @@
+"""
+A burst of decision calls against a provider quota (the mock backend's
+simulated requests- and tokens-per-minute limits): the fixed in-flight cap
+against the AIMD window of agent.ratelimit, alone and with the client-side
+request and token budgets set to the quota.
+
+    python -m bench.ratelimit --calls 100 --rpm 600 --tpm 200000 --latency 0.3
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from time import perf_counter
+
+from agent.backends import MockBackend, MockConfig
+from agent.gateway import GatewayConfig, LLMGateway
+from agent.ratelimit import RateLimitConfig
+
+CONFIGS = [
+    # (name, ADAPTIVE, client-side budgets)
+    ("fixed", False, False),
+    ("window", True, False),
+    ("budget", True, True),
+]
+PROMPT = "You are playing Among Us. " * 60  # about 400 tokens
+
+
+async def run(args, adaptive: bool, budgets: bool) -> dict:
+    rate_config = type(
+        "Config",
+        (RateLimitConfig,),
+        {
+            "ADAPTIVE": adaptive,
+            "REQUESTS_PER_MINUTE": args.rpm if budgets else None,
+            "TOKENS_PER_MINUTE": args.tpm if budgets else None,
+            "BURST_SECONDS": MockConfig.QUOTA_BURST_SECONDS,
+        },
+    )
+    config = type("Config", (GatewayConfig,), {"MAX_IN_FLIGHT": args.in_flight})
+    gateway = LLMGateway(config, MockBackend(), rate_config)
+    failed = 0
+
+    async def call():
+        nonlocal failed
+        try:
+            await gateway.complete(
+                messages=[
+                    {"role": "system", "content": PROMPT},
+                    {"role": "user", "content": "What would you like to do?"},
+                ],
+                max_completion_tokens=100,
+            )
+        except Exception:
+            failed += 1
+
+    start = perf_counter()
+    await asyncio.gather(*[call() for _ in range(args.calls)])
+    elapsed = perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "failed": failed,
+        "throttled": gateway.stats.status_counts.get(429, 0),
+        "retries": gateway.stats.retries,
+        "p95": gateway.stats.percentile(0.95),
+        "window": gateway.rate.window,
+    }
+
+
+async def main(args):
+    MockConfig.MEDIAN_LATENCY = args.latency
+    MockConfig.REQUESTS_PER_MINUTE = args.rpm
+    MockConfig.TOKENS_PER_MINUTE = args.tpm
+    quota = min(args.rpm / 60, args.tpm / 60 / 500)  # calls per second, ~500 tokens each
+    print(
+        f"{args.calls} calls, quota {args.rpm:.0f} rpm / {args.tpm:.0f} tpm "
+        f"(~{quota:.1f} calls/s), {args.in_flight} in flight at most"
+    )
+    print(
+        f"{'':<8} {'done':>6} {'calls/s':>8} {'of quota':>9} {'429s':>5} "
+        f"{'retries':>8} {'failed':>7} {'p95':>6} {'window':>7}"
+    )
+    for name, adaptive, budgets in CONFIGS:
+        MockConfig.SEED = args.seed  # same latencies for each
+        result = await run(args, adaptive, budgets)
+        rate = (args.calls - result["failed"]) / result["elapsed"]
+        print(
+            f"{name:<8} {result['elapsed']:>5.1f}s {rate:>8.1f} {rate / quota:>9.0%} "
+            f"{result['throttled']:>5} {result['retries']:>8} {result['failed']:>7} "
+            f"{result['p95']:>5.2f}s {result['window']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--rpm", type=float, default=600)
+    parser.add_argument("--tpm", type=float, default=200_000)
+    parser.add_argument("--in-flight", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
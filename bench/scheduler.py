@@ -0,0 +1,85 @@
+"""
+Time to completion of urgent and routine decision calls when a burst of them
+exceeds the gateway's in-flight cap: first come first served (every call at
+the same level) against the urgency levels of agent.scheduler.
+
+    python -m bench.scheduler --calls 120 --in-flight 8 --latency 0.1
+"""
+
+import asyncio
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from agent.backends import MockBackend, MockConfig
+from agent.constants import AgentState, Event
+from agent.gateway import GatewayConfig, LLMGateway
+from agent.scheduler import SchedulerConfig, urgency
+
+EVENTS = [
+    ("reachLocation", 0.35),
+    ("seePlayer", 0.3),
+    ("completeTask", 0.15),
+    ("seePlayerEnd", 0.1),
+    ("killRange", 0.05),
+    ("seeBody", 0.05),
+]
+
+
+def burst(calls: int, seed: int) -> list[tuple[str, int]]:
+    rng = Random(seed)
+    types, weights = zip(*EVENTS)
+    out = []
+    for i in range(calls):
+        event_type = rng.choices(types, weights)[0]
+        sabotage = {"Reactor": True} if rng.random() < 0.05 else {}
+        state = AgentState("Cafeteria", sabotage=sabotage)
+        out.append((event_type, urgency([Event(event_type, "", 0.0)], state, "crewmate")))
+    return out
+
+
+async def run(calls: list[tuple[str, int]], in_flight: int, prioritised: bool) -> dict:
+    config = type("Config", (GatewayConfig,), {"MAX_IN_FLIGHT": in_flight})
+    gateway = LLMGateway(config, MockBackend())
+    done: dict[str, list[float]] = {"urgent": [], "routine": []}
+    start = perf_counter()
+
+    async def call(level: int):
+        await gateway.complete(
+            priority=level if prioritised else SchedulerConfig.DEFAULT_LEVEL,
+            messages=[{"role": "user", "content": "What would you like to do?"}],
+        )
+        done["urgent" if level == 0 else "routine"].append(perf_counter() - start)
+
+    await asyncio.gather(*[call(level) for _, level in calls])
+    return done
+
+
+def p(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def main(args):
+    MockConfig.MEDIAN_LATENCY = args.latency
+    calls = burst(args.calls, args.seed)
+    urgent = sum(level == 0 for _, level in calls)
+    print(f"{args.calls} calls ({urgent} urgent), {args.in_flight} in flight")
+    print(f"{'':<10} {'urgent p50':>11} {'urgent p95':>11} {'routine p50':>12} {'all done':>9}")
+    for name, prioritised in (("fifo", False), ("priority", True)):
+        MockConfig.SEED = args.seed  # same latencies for both
+        done = await run(calls, args.in_flight, prioritised)
+        print(
+            f"{name:<10} {p(done['urgent'], 0.5):>10.2f}s {p(done['urgent'], 0.95):>10.2f}s "
+            f"{p(done['routine'], 0.5):>11.2f}s "
+            f"{max(done['urgent'] + done['routine']):>8.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--calls", type=int, default=120)
+    parser.add_argument("--in-flight", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
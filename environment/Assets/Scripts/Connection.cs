@@ -13,6 +13,7 @@ public class Connection : MonoBehaviour
     private const string host = "127.0.0.1";
     private const int port = 12345;
     private const char Delimiter = '\n';
+    private const string BatchComplete = "BatchComplete";
 
     private TcpClient client;
     private NetworkStream stream;
@@ -205,17 +206,26 @@ public class Connection : MonoBehaviour
                     if (string.IsNullOrEmpty(line)) continue;
 
                     JArray actionsArray;
+                    bool resume;
                     JToken token = JToken.Parse(line);
 
                     if (token is JArray arr)
+                    {
+                        // Whole batch in one reply: apply it and resume time.
                         actionsArray = arr;
+                        resume = true;
+                    }
                     else if (token is JObject obj)
-                        actionsArray = new JArray(obj);
+                    {
+                        // Streamed reply: one action per frame, time resumes on BatchComplete.
+                        resume = obj["type"]?.ToString() == BatchComplete;
+                        actionsArray = resume ? null : new JArray(obj);
+                    }
                     else
                         continue;
 
                     if (umtd != null)
-                        umtd.Enqueue(() => StartCoroutine(ApplyActionsCoroutine(actionsArray)));
+                        umtd.Enqueue(() => StartCoroutine(ApplyActionsCoroutine(actionsArray, resume)));
                     else
                         Debug.LogError("[Connection] UnityMainThreadDispatcher not found.");
                 }
@@ -230,10 +240,13 @@ public class Connection : MonoBehaviour
         Debug.Log("[Connection] Receive thread exiting.");
     }
 
-    private IEnumerator ApplyActionsCoroutine(JArray actionsArray)
+    private IEnumerator ApplyActionsCoroutine(JArray actionsArray, bool resume)
     {
-        _waitingForResponse = false;
-        Time.timeScale = 1f;
+        if (resume)
+        {
+            _waitingForResponse = false;
+            Time.timeScale = 1f;
+        }
 
         if (actionsArray == null) yield break;
 
@@ -251,6 +264,12 @@ public class Connection : MonoBehaviour
                 continue;
             }
 
+            if (type == "ChatDelta")
+            {
+                GameManager.instance.HandleChatDelta(agentId, details);
+                continue;
+            }
+
             if (type == "Vote")
             {
                 GameManager.instance.HandleVote(details);
@@ -1,5 +1,6 @@
 ﻿using System.Collections;
 using System.Collections.Generic;
+using System.Text;
 using UnityEngine;
 using UnityEngine.UI;
 using TMPro;
@@ -39,6 +40,8 @@ public class GameManager : MonoBehaviour
         };
 
     private readonly List<string> _chatLines = new List<string>();
+    private string _streamingAgent;  // whose ChatDelta frames fill the last line
+    private readonly StringBuilder _streamingText = new StringBuilder();
 
     public Waypoint deadNode;
 
@@ -71,6 +74,8 @@ public class GameManager : MonoBehaviour
         anim.Play("BodyReport", -1, 0f);
         yield return new WaitForSecondsRealtime(2f);
         _chatLines.Clear();
+        _streamingAgent = null;
+        _streamingText.Clear();
         meetingText.text = "";
         meetingScreen.SetActive(true);
     }
@@ -80,6 +85,8 @@ public class GameManager : MonoBehaviour
         anim.Play("MeetingReport", -1, 0f);
         yield return new WaitForSecondsRealtime(2f);
         _chatLines.Clear();
+        _streamingAgent = null;
+        _streamingText.Clear();
         meetingText.text = "";
         meetingScreen.SetActive(true);
     }
@@ -87,11 +94,36 @@ public class GameManager : MonoBehaviour
 
     public void HandleChat(string agentId, string message)
     {
-        string hex = _agentHexColors.TryGetValue(agentId, out string h) ? h : "#FFFFFF";
-        _chatLines.Add($"<color={hex}>[{agentId}]</color>: {message}");
+        // The final text of a streamed message replaces its partial line.
+        if (_streamingAgent == agentId && _chatLines.Count > 0)
+            _chatLines[_chatLines.Count - 1] = ChatLine(agentId, message);
+        else
+            _chatLines.Add(ChatLine(agentId, message));
+        _streamingAgent = null;
+        _streamingText.Clear();
+        RefreshChatText();
+    }
+
+    public void HandleChatDelta(string agentId, string delta)
+    {
+        // Speakers take turns, so the message being streamed is always the last line.
+        if (_streamingAgent != agentId)
+        {
+            _streamingAgent = agentId;
+            _streamingText.Clear();
+            _chatLines.Add("");
+        }
+        _streamingText.Append(delta);
+        _chatLines[_chatLines.Count - 1] = ChatLine(agentId, _streamingText.ToString());
         RefreshChatText();
     }
 
+    private static string ChatLine(string agentId, string message)
+    {
+        string hex = _agentHexColors.TryGetValue(agentId, out string h) ? h : "#FFFFFF";
+        return $"<color={hex}>[{agentId}]</color>: {message}";
+    }
+
     private void RefreshChatText()
     {
         meetingText.text = string.Join("\n", _chatLines);
@@ -191,6 +223,8 @@ public class GameManager : MonoBehaviour
         yield return new WaitForSecondsRealtime(1.5f);
 
         _chatLines.Clear();
+        _streamingAgent = null;
+        _streamingText.Clear();
         meetingText.text = "";
         meetingScreen.SetActive(false);
 
@@ -8,7 +8,8 @@ public class VentManager : MonoBehaviour
     [Header("Vent Networks")]
     public List<VentNetwork> ventNetworks = new List<VentNetwork>();
 
-    private Dictionary<Waypoint, VentNetwork> _ventMap = new();
+    // A vent can belong to several networks (Reactor, Navigation).
+    private Dictionary<Waypoint, List<VentNetwork>> _ventMap = new();
 
     private void Awake()
     {
@@ -29,10 +30,9 @@ public class VentManager : MonoBehaviour
             foreach (Waypoint vent in network.vents)
             {
                 if (vent == null) continue;
-                if (_ventMap.ContainsKey(vent))
-                    Debug.LogWarning($"[VentManager] '{vent.name}' appears in multiple networks — using first.");
-                else
-                    _ventMap[vent] = network;
+                if (!_ventMap.TryGetValue(vent, out List<VentNetwork> networks))
+                    _ventMap[vent] = networks = new List<VentNetwork>();
+                networks.Add(network);
             }
         }
         Debug.Log($"[VentManager] Built vent map with {_ventMap.Count} registered vents.");
@@ -44,20 +44,24 @@ public class VentManager : MonoBehaviour
 
     public List<Waypoint> GetConnectedVents(Waypoint vent)
     {
-        if (!_ventMap.TryGetValue(vent, out VentNetwork network)) return null;
+        if (!_ventMap.TryGetValue(vent, out List<VentNetwork> networks)) return null;
 
         var connected = new List<Waypoint>();
-        foreach (Waypoint v in network.vents)
-            if (v != null && v != vent)
-                connected.Add(v);
+        foreach (VentNetwork network in networks)
+            foreach (Waypoint v in network.vents)
+                if (v != null && v != vent && !connected.Contains(v))
+                    connected.Add(v);
         return connected;
     }
 
     public bool AreConnected(Waypoint origin, Waypoint target)
     {
-        if (!_ventMap.TryGetValue(origin, out VentNetwork originNetwork)) return false;
-        if (!_ventMap.TryGetValue(target, out VentNetwork targetNetwork)) return false;
-        return originNetwork == targetNetwork;
+        if (!_ventMap.TryGetValue(origin, out List<VentNetwork> originNetworks)) return false;
+        if (!_ventMap.TryGetValue(target, out List<VentNetwork> targetNetworks)) return false;
+        foreach (VentNetwork network in originNetworks)
+            if (targetNetworks.Contains(network))
+                return true;
+        return false;
     }
 }
 
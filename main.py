@@ -1,9 +1,32 @@
+import os
+from argparse import ArgumentParser
 from asyncio import run
 
-from agent.data import DataHandler
+from agent.session import SessionManager
+from agent.supervisor import Supervisor
+
+
+async def main(workers: int):
+    if workers > 1:
+        await Supervisor(workers=workers).serve_forever()
+    else:
+        await SessionManager().serve_forever()
+
 
 if __name__ == "__main__":
-    handler = DataHandler()
-    handler.initialize_agents()
-    handler.create_host()
-    run(handler.main_loop())
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes hosting game sessions (1 runs everything in-process)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "mock"],
+        help="LLM backend; mock answers offline with simulated latency",
+    )
+    args = parser.parse_args()
+    if args.backend:
+        os.environ["LLM_BACKEND"] = args.backend  # inherited by worker processes
+    run(main(args.workers))
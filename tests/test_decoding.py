@@ -0,0 +1,61 @@
+import unittest
+from json import dumps
+
+from agent.decoding import BatchDecodeError, decode_events
+
+PLAYERS = ["Red", "Blue"]
+
+
+def entry(agent: str, type: str, time: float, details: str = "", location: str = "Cafeteria"):
+    return {
+        "agent": agent,
+        "event": {"type": type, "details": details, "time": time},
+        "state": {"location": location, "tasks": [{"location": "Admin", "type": "short"}]},
+    }
+
+
+class DecodeEventsTest(unittest.TestCase):
+    def test_groups_by_agent_in_time_order_with_the_latest_state(self):
+        batch = decode_events(
+            [
+                entry("Red", "seePlayer:Blue", 3.0, location="Admin"),
+                entry("Blue", "completeTask", 1.0),
+                entry("Red", "reachLocation", 2.0, location="Cafeteria"),
+            ],
+            PLAYERS,
+        )
+        self.assertEqual([event.time for _, event in batch.events], [1.0, 2.0, 3.0])
+        self.assertEqual([event.time for event in batch.agents["Red"].events], [2.0, 3.0])
+        self.assertEqual(batch.agents["Red"].state.location, "Admin")
+        self.assertEqual(batch.agents["Blue"].state.tasks[0].location, "Admin")
+
+    def test_entries_without_a_state_keep_the_last_one_sent(self):
+        stateless = entry("Red", "reachLocation", 2.0)
+        del stateless["state"]
+        earlier = entry("Red", "seePlayer", 1.0, location="Admin")
+        batch = decode_events([earlier, stateless], PLAYERS)
+        self.assertEqual(batch.agents["Red"].state.location, "Admin")
+        with self.assertRaises(BatchDecodeError):
+            decode_events([stateless], PLAYERS)
+
+    def test_meeting_details_are_parsed(self):
+        details = dumps({"caller": "Red", "body": "Blue", "alivePlayers": PLAYERS})
+        batch = decode_events([entry("Red", "bodyFound", 1.0, details)], PLAYERS)
+        self.assertEqual(batch.events[0][1].data["body"], "Blue")
+
+    def test_malformed_entries_raise_batch_decode_errors(self):
+        cases = [
+            "not a list",
+            [1],
+            [entry("Green", "seePlayer", 1.0)],
+            [{"agent": "Red", "event": {"type": "x", "details": "", "time": "1"}}],
+            [entry("Red", "bodyFound", 1.0, "not json")],
+            [entry("Red", "emergencyMeeting", 1.0, "3")],
+        ]
+        for entries in cases:
+            with self.subTest(entries=entries), self.assertRaises(BatchDecodeError):
+                decode_events(entries, PLAYERS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from agent.framing import NDJSONFramer
+
+
+def collect(framer: NDJSONFramer) -> list[bytes]:
+    return [bytes(frame) for frame in framer.frames()]
+
+
+class NDJSONFramerTest(unittest.TestCase):
+    def test_several_frames_in_one_read(self):
+        framer = NDJSONFramer()
+        framer.feed(b'{"a": 1}\n{"b": 2}\n')
+        self.assertEqual(collect(framer), [b'{"a": 1}', b'{"b": 2}'])
+        self.assertEqual(len(framer), 0)
+
+    def test_partial_frame_waits_for_its_delimiter(self):
+        framer = NDJSONFramer()
+        framer.feed(b'{"a": 1}\n{"b"')
+        self.assertEqual(collect(framer), [b'{"a": 1}'])
+        self.assertEqual(len(framer), 4)
+        framer.feed(b": 2}\n")
+        self.assertEqual(collect(framer), [b'{"b": 2}'])
+
+    def test_frame_split_one_byte_at_a_time(self):
+        framer = NDJSONFramer()
+        out = []
+        for byte in b'{"a": 1}\n{"b": 2}\n':
+            framer.feed(bytes([byte]))
+            out += collect(framer)
+        self.assertEqual(out, [b'{"a": 1}', b'{"b": 2}'])
+
+    def test_multibyte_character_split_across_reads(self):
+        framer = NDJSONFramer()
+        data = '{"chat": "café"}\n'.encode("utf-8")
+        split = data.index(b"\xc3") + 1
+        framer.feed(data[:split])
+        self.assertEqual(collect(framer), [])
+        framer.feed(data[split:])
+        self.assertEqual(collect(framer), [data[:-1]])
+
+    def test_multibyte_delimiter_split_across_reads(self):
+        framer = NDJSONFramer(delimiter=b"\r\n")
+        framer.feed(b"one\r")
+        self.assertEqual(collect(framer), [])
+        framer.feed(b"\ntwo\r\n")
+        self.assertEqual(collect(framer), [b"one", b"two"])
+
+    def test_empty_lines_are_skipped(self):
+        framer = NDJSONFramer()
+        framer.feed(b"\n\none\n\n")
+        self.assertEqual(collect(framer), [b"one"])
+
+    def test_feed_while_a_frame_is_still_referenced(self):
+        framer = NDJSONFramer()
+        framer.feed(b"one\ntw")
+        held = next(framer.frames())
+        framer.feed(b"o\n")
+        self.assertEqual(collect(framer), [b"two"])
+        self.assertEqual(bytes(held), b"one")
+
+    def test_oversized_frame_raises(self):
+        framer = NDJSONFramer(max_frame_size=8)
+        framer.feed(b"0123456789")
+        with self.assertRaises(ValueError):
+            collect(framer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from random import Random
+
+from agent.constants import Event
+from agent.history import GameLog, HistoryStore
+
+
+def event(time: float, details: str = "") -> Event:
+    return Event(type="seePlayer", details=details or f"e{time}", time=time)
+
+
+def details(entries) -> list[str]:
+    return [entry.details for entry in entries]
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.log = GameLog()
+        self.red = HistoryStore(self.log)
+        self.blue = HistoryStore(self.log)
+
+    def test_own_entries_and_broadcasts_merge_in_time_order(self):
+        self.red.add(event(1.0, "red 1"))
+        self.blue.add(event(2.0, "blue 2"))
+        self.log.broadcast(event(3.0, "chat 3"))
+        self.red.add(event(4.0, "red 4"))
+        self.assertEqual(details(self.red), ["red 1", "chat 3", "red 4"])
+        self.assertEqual(details(self.blue), ["blue 2", "chat 3"])
+        self.assertEqual(len(self.red), 3)
+
+    def test_own_entries_come_first_on_equal_times(self):
+        self.log.broadcast(event(5.0, "chat"))
+        self.red.add(event(5.0, "red"))
+        self.assertEqual(details(self.red), ["red", "chat"])
+
+    def test_late_entries_are_inserted_in_time_order(self):
+        self.red.extend([event(1.0), event(3.0)])
+        self.red.add(event(2.0))
+        self.log.broadcast(event(0.5, "chat"))
+        self.assertEqual(details(self.red), ["chat", "e1.0", "e2.0", "e3.0"])
+
+    def test_indexing_and_slicing(self):
+        self.red.extend([event(1.0), event(3.0)])
+        self.log.broadcast(event(2.0, "chat"))
+        self.assertEqual(self.red[1].details, "chat")
+        self.assertEqual(self.red[-1].details, "e3.0")
+        self.assertEqual(details(self.red[1:]), ["chat", "e3.0"])
+        self.assertEqual(details(self.red.last(2)), ["chat", "e3.0"])
+        with self.assertRaises(IndexError):
+            self.red[3]
+
+    def test_between_is_inclusive(self):
+        self.red.extend([event(1.0), event(2.0), event(4.0)])
+        self.log.broadcast(event(3.0, "chat"))
+        self.assertEqual(details(self.red.between(2.0, 3.0)), ["e2.0", "chat"])
+        self.assertEqual(details(self.red.between(5.0, 9.0)), [])
+
+    def test_count_until(self):
+        self.red.extend([event(1.0), event(2.0)])
+        self.log.broadcast(event(2.0, "chat"))
+        self.assertEqual(self.red.count_until(0.0), 0)
+        self.assertEqual(self.red.count_until(2.0), 3)
+
+    def test_since_follows_arrival_order_not_time(self):
+        self.red.add(event(9.0, "later own"))
+        mark = self.red.mark()
+        self.log.broadcast(event(5.0, "chat"))
+        self.blue.add(event(6.0, "not red's"))
+        self.red.add(event(7.0, "red"))
+        self.assertEqual(details(self.red.since(mark)), ["chat", "red"])
+        self.assertEqual(self.red.since(self.red.mark()), [])
+
+    def test_merge_matches_a_sorted_copy(self):
+        rng = Random(0)
+        expected = {"red": [], "blue": []}
+        stores = {"red": self.red, "blue": self.blue}
+        for i in range(500):
+            entry = event(float(rng.randint(0, 100)), str(i))
+            kind = rng.choice(["red", "blue", "chat"])
+            if kind == "chat":
+                self.log.broadcast(entry)
+                for name in expected:
+                    expected[name].append((entry.time, 1, i, entry))
+            else:
+                stores[kind].add(entry)
+                expected[kind].append((entry.time, 0, i, entry))
+        for name, store in stores.items():
+            ordered = [entry for *_, entry in sorted(expected[name])]
+            self.assertEqual(details(store), details(ordered))
+            self.assertEqual(details(store[100:200]), details(ordered[100:200]))
+            self.assertEqual(
+                details(store.between(20.0, 30.0)),
+                details(e for e in ordered if 20.0 <= e.time <= 30.0),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import unittest
+from json import dumps
+
+from agent.constants import Event
+from agent.history import GameLog
+from agent.meeting import SKIP, Ballot, Meeting, MeetingConfig, Tally
+
+PLAYERS = ["Red", "Blue", "Green", "Pink"]
+
+
+def tally(*targets: str) -> str:
+    return Tally([Ballot(f"voter{i}", target) for i, target in enumerate(targets)]).result
+
+
+class BallotTest(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Ballot.parse("Red", '{"vote": "Blue"}', PLAYERS).target, "Blue")
+        self.assertEqual(Ballot.parse("Red", '{"vote": "skip"}', PLAYERS).target, SKIP)
+
+    def test_unusable_votes_are_missed_skips(self):
+        for arguments in [None, "", "not json", "[]", '{"choice": "Blue"}', '{"vote": "Black"}']:
+            with self.subTest(arguments=arguments):
+                ballot = Ballot.parse("Red", arguments, PLAYERS)
+                self.assertTrue(ballot.missed)
+                self.assertEqual(ballot.target, SKIP)
+
+
+class TallyTest(unittest.TestCase):
+    def test_most_votes_is_ejected(self):
+        self.assertEqual(tally("Red", "Red", "Blue", SKIP), "Red")
+
+    def test_tie_for_most_votes_ejects_nobody(self):
+        self.assertEqual(tally("Red", "Blue"), SKIP)
+        self.assertEqual(tally("Blue", "Red", "Blue", "Red", "Green"), SKIP)
+
+    def test_skip_wins_ties(self):
+        self.assertEqual(tally("Red", SKIP), SKIP)
+        self.assertEqual(tally(SKIP, SKIP, "Red"), SKIP)
+
+    def test_no_votes(self):
+        self.assertEqual(tally(), SKIP)
+
+    def test_counts(self):
+        counts = Tally([Ballot("a", "Red"), Ballot("b", "Red"), Ballot("c", missed=True)]).counts
+        self.assertEqual(counts, {"Red": 2, SKIP: 1})
+
+
+class Voter:
+    def __init__(self, vote: str | None, delay: float = 0.0, error: Exception | None = None):
+        self.vote = vote
+        self.delay = delay
+        self.error = error
+
+    async def on_vote(self, candidates):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return dumps({"vote": self.vote})
+
+
+class Speaker(Voter):
+    def __init__(self, deltas: list[str], fails: bool = False, reply: str | None = None):
+        super().__init__(SKIP)
+        self.deltas = deltas
+        self.fails = fails
+        self.reply = reply
+        self.chat_draft = None
+
+    def prepare_chat(self):
+        pass
+
+    async def stream_chat(self, body_found, question_round, was_reporter=False):
+        for delta in self.deltas:
+            yield delta
+        if self.fails:
+            raise RuntimeError("connection reset")
+
+    async def on_request_chat(self, body_found, question_round, was_reporter=False):
+        if self.reply is None:
+            raise RuntimeError("still down")
+        return self.reply
+
+
+class DiscussTest(unittest.TestCase):
+    def test_failed_streams_do_not_end_the_meeting(self):
+        config = type("Config", (MeetingConfig,), {"CHAT_ROUNDS": 1, "PREFETCH_CHAT": False})
+        agents = {
+            "Red": Speaker(["I saw ", "Blue"], fails=True),
+            "Blue": Speaker([], fails=True, reply="Not me."),
+            "Green": Speaker([], fails=True),
+            "Pink": Speaker(["Skip."]),
+        }
+        sent = []
+
+        async def send(frame: dict):
+            sent.append(frame)
+
+        details = dumps({"caller": "Red", "body": "Yellow", "alivePlayers": PLAYERS})
+        meeting = Meeting(
+            Event("bodyFound", details, 1.0), agents, GameLog(), send, config  # type: ignore
+        )
+
+        tally = asyncio.run(meeting.run())
+
+        chats = [(frame["agent"], frame["details"]) for frame in sent if frame["type"] == "Chat"]
+        self.assertEqual(chats, [("Red", "I saw Blue"), ("Blue", "Not me."), ("Pink", "Skip.")])
+        self.assertEqual(tally.result, SKIP)
+        self.assertEqual(sent[-1]["type"], "Vote")
+
+
+class CollectVotesTest(unittest.TestCase):
+    def test_late_and_failed_voters_are_missed(self):
+        config = type("Config", (MeetingConfig,), {"VOTE_DEADLINE": 0.05})
+        agents = {
+            "Red": Voter("Blue"),
+            "Blue": Voter("Red", delay=1.0),
+            "Green": Voter(None, error=RuntimeError("no reply")),
+            "Pink": Voter("Blue"),
+        }
+        details = dumps({"caller": "Red", "body": "Yellow", "alivePlayers": PLAYERS})
+        meeting = Meeting(
+            Event("bodyFound", details, 1.0), agents, GameLog(), None, config  # type: ignore
+        )
+
+        ballots = asyncio.run(meeting.collect_votes())
+
+        self.assertEqual([ballot.voter for ballot in ballots], PLAYERS)
+        self.assertEqual([ballot.missed for ballot in ballots], [False, True, True, False])
+        # The two missed ballots count as skips and tie Blue's two votes.
+        self.assertEqual(Tally(ballots).result, SKIP)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import asyncio
+import unittest
+
+from agent.ratelimit import RateController, RateLimitConfig, TokenBucket
+from agent.scheduler import PriorityLimiter
+
+
+def config(**overrides):
+    return type("Config", (RateLimitConfig,), overrides)
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_starts_full_and_refills_at_its_rate(self):
+        bucket = TokenBucket(per_minute=600, burst_seconds=2, now=0.0)
+        self.assertEqual(bucket.capacity, 20)
+        bucket.take(20)
+        self.assertEqual(bucket.wait(5), 0.5)
+        bucket.refill(0.5)
+        self.assertEqual(bucket.level, 5)
+        self.assertEqual(bucket.wait(5), 0.0)
+
+    def test_never_fills_past_capacity(self):
+        bucket = TokenBucket(per_minute=600, burst_seconds=2, now=0.0)
+        bucket.refill(100.0)
+        self.assertEqual(bucket.level, 20)
+        bucket.give(5)
+        self.assertEqual(bucket.level, 20)
+
+    def test_oversized_amounts_wait_for_a_full_bucket_only(self):
+        bucket = TokenBucket(per_minute=600, burst_seconds=2, now=0.0)
+        bucket.take(20)
+        self.assertEqual(bucket.wait(1000), 2.0)
+
+    def test_debt_is_paid_back_before_new_takes(self):
+        bucket = TokenBucket(per_minute=600, burst_seconds=2, now=0.0)
+        bucket.take(30)
+        self.assertEqual(bucket.level, -10)
+        self.assertEqual(bucket.wait(1), 1.1)
+
+
+class WindowTest(unittest.TestCase):
+    def test_initial_window(self):
+        self.assertEqual(RateController(16, config(INITIAL_WINDOW=4)).limit, 4)
+        self.assertEqual(RateController(2, config(INITIAL_WINDOW=4)).limit, 2)
+        self.assertEqual(RateController(16, config(ADAPTIVE=False)).limit, 16)
+
+    def test_grows_by_about_one_per_window_of_fast_calls(self):
+        rate = RateController(16, config(INITIAL_WINDOW=4))
+        for _ in range(4):
+            rate.succeeded(1.0)
+        self.assertEqual(rate.limit, 4)
+        rate.succeeded(1.0)
+        self.assertEqual(rate.limit, 5)
+
+    def test_slow_calls_do_not_grow_it(self):
+        rate = RateController(16, config(INITIAL_WINDOW=4, LATENCY_FACTOR=2.0))
+        for _ in range(10):
+            rate.succeeded(1.0)
+        window = rate.window
+        rate.succeeded(5.0)
+        self.assertEqual(rate.window, window)
+
+    def test_never_grows_past_the_maximum(self):
+        rate = RateController(3, config(INITIAL_WINDOW=3))
+        for _ in range(20):
+            rate.succeeded(1.0)
+        self.assertEqual(rate.limit, 3)
+
+    def test_429_halves_it_once_per_burst(self):
+        rate = RateController(16, config(INITIAL_WINDOW=8, PAUSE_SECONDS=1.0))
+        for _ in range(8):
+            rate.succeeded(10.0)  # a median latency longer than the test
+        window = rate.window
+        rate.throttled(None)
+        rate.throttled(None)
+        self.assertEqual(rate.window, window / 2)
+        self.assertEqual(rate.throttles, 2)
+
+    def test_floor(self):
+        rate = RateController(16, config(INITIAL_WINDOW=1, MIN_WINDOW=1))
+        rate.throttled(None)
+        self.assertEqual(rate.limit, 1)
+
+    def test_429_pauses_new_calls(self):
+        rate = RateController(16, config(PAUSE_SECONDS=5.0))
+        rate.throttled(None)
+        self.assertGreater(rate.budget()["paused"], 4.0)
+        rate.throttled(30.0)  # a Retry-After
+        self.assertGreater(rate.budget()["paused"], 29.0)
+
+    def test_no_adaptation_when_disabled(self):
+        rate = RateController(16, config(ADAPTIVE=False))
+        rate.throttled(None)
+        rate.succeeded(1.0)
+        self.assertEqual(rate.limit, 16)
+
+
+class BudgetTest(unittest.TestCase):
+    def controller(self) -> RateController:
+        # 100 requests and 1000 tokens of burst, refilling slowly enough
+        # that a test never sees it.
+        return RateController(
+            16, config(REQUESTS_PER_MINUTE=600, TOKENS_PER_MINUTE=6000, BURST_SECONDS=10)
+        )
+
+    def test_reserve_takes_one_request_and_the_estimate(self):
+        rate = self.controller()
+        asyncio.run(rate.reserve(400))
+        budget = rate.budget()
+        self.assertEqual(budget["requests"], 99)
+        self.assertLessEqual(budget["tokens"], 601)
+
+    def test_rejected_calls_get_their_tokens_back(self):
+        rate = self.controller()
+        reserved = asyncio.run(rate.reserve(400))
+        rate.settle(reserved, 0)
+        self.assertGreaterEqual(rate.budget()["tokens"], 999)
+
+    def test_overestimates_are_kept_and_underestimates_charged(self):
+        rate = self.controller()
+        reserved = asyncio.run(rate.reserve(400))
+        rate.settle(reserved, 100)
+        self.assertLessEqual(rate.budget()["tokens"], 601)
+        reserved = asyncio.run(rate.reserve(100))
+        rate.settle(reserved, 700)
+        self.assertLessEqual(rate.budget()["tokens"], 1)
+
+    def test_split_shares_the_quotas(self):
+        rate = self.controller()
+        rate.split(4)
+        self.assertEqual(rate.budget()["tokens"], 250)
+        self.assertEqual(rate.budget()["requests"], 25)
+
+    def test_no_buckets_without_quotas(self):
+        rate = RateController(16)
+        asyncio.run(rate.reserve(10**9))
+        self.assertIsNone(rate.budget()["tokens"])
+
+
+class ResizeTest(unittest.TestCase):
+    def test_growing_hands_slots_to_waiters(self):
+        async def main():
+            limiter = PriorityLimiter(1)
+            await limiter.acquire(3)
+            waiters = [asyncio.create_task(limiter.acquire(3)) for _ in range(2)]
+            await asyncio.sleep(0)
+            limiter.resize(3)
+            await asyncio.wait_for(asyncio.gather(*waiters), 1.0)
+            self.assertEqual(limiter._free, 0)
+
+        asyncio.run(main())
+
+    def test_shrinking_lets_running_calls_finish(self):
+        async def main():
+            limiter = PriorityLimiter(3)
+            for _ in range(3):
+                await limiter.acquire(3)
+            limiter.resize(1)
+            waiter = asyncio.create_task(limiter.acquire(3))
+            limiter.release()
+            limiter.release()
+            await asyncio.sleep(0)
+            self.assertFalse(waiter.done())  # two releases only pay back the excess
+            limiter.release()
+            await asyncio.wait_for(waiter, 1.0)
+            self.assertEqual(limiter._free, 0)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import unittest
+
+from agent.constants import AgentState, Event
+from agent.scheduler import PriorityLimiter, SchedulerConfig, urgency
+
+
+class UrgencyTest(unittest.TestCase):
+    def test_most_urgent_event_sets_the_level(self):
+        events = [Event("reachLocation", "", 1.0), Event("seeBody:Blue", "", 2.0)]
+        self.assertEqual(urgency(events, AgentState("Admin"), "crewmate"), 0)
+
+    def test_unknown_events_get_the_default_level(self):
+        events = [Event("somethingNew", "", 1.0)]
+        self.assertEqual(urgency(events, None, "crewmate"), SchedulerConfig.DEFAULT_LEVEL)
+        self.assertEqual(urgency([], None, "crewmate"), SchedulerConfig.DEFAULT_LEVEL)
+
+    def test_critical_sabotage_makes_crewmate_calls_urgent(self):
+        events = [Event("reachLocation", "", 1.0)]
+        state = AgentState("Admin", sabotage={"Reactor": True})
+        self.assertEqual(urgency(events, state, "crewmate"), SchedulerConfig.CRITICAL_LEVEL)
+        self.assertEqual(urgency(events, state, "imposter"), 4)
+
+
+class PriorityLimiterTest(unittest.TestCase):
+    def run_order(self, limiter: PriorityLimiter, arrivals: list[tuple[str, int, float]]):
+        """Queue (name, level, delay before queueing) behind one held slot."""
+        order = []
+
+        async def waiter(name: str, level: int):
+            async with limiter.slot(level):
+                order.append(name)
+
+        async def main():
+            await limiter.acquire(SchedulerConfig.DEFAULT_LEVEL)
+            tasks = []
+            for name, level, delay in arrivals:
+                await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(waiter(name, level)))
+                await asyncio.sleep(0)  # let it queue
+            limiter.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(main())
+        return order
+
+    def test_free_slots_are_taken_at_once(self):
+        async def main():
+            limiter = PriorityLimiter(2)
+            await limiter.acquire(3)
+            await limiter.acquire(3)
+            self.assertEqual(limiter.waiting, 0)
+
+        asyncio.run(main())
+
+    def test_urgent_waiters_go_first_then_oldest(self):
+        order = self.run_order(
+            PriorityLimiter(1),
+            [("routine", 3, 0.0), ("urgent", 0, 0.0), ("meeting", 1, 0.0), ("urgent 2", 0, 0.0)],
+        )
+        self.assertEqual(order, ["urgent", "urgent 2", "meeting", "routine"])
+
+    def test_long_waits_age_into_priority(self):
+        config = type("Config", (SchedulerConfig,), {"LEVEL_SECONDS": 0.01})
+        order = self.run_order(
+            PriorityLimiter(1, config), [("old routine", 3, 0.0), ("urgent", 0, 0.1)]
+        )
+        self.assertEqual(order, ["old routine", "urgent"])
+
+    def test_cancelled_waiter_gives_up_its_place(self):
+        async def main():
+            limiter = PriorityLimiter(1)
+            await limiter.acquire(3)
+            cancelled = asyncio.create_task(limiter.acquire(0))
+            waiting = asyncio.create_task(limiter.acquire(3))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.sleep(0)
+            limiter.release()
+            await asyncio.wait_for(waiting, 1.0)
+            self.assertEqual(limiter.waiting, 0)
+            self.assertEqual(limiter._free, 0)
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()